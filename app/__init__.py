@@ -1,11 +1,41 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from config import Config
 import os
+import threading
 
 db = SQLAlchemy()
 
-def create_app():
+def _sqlite_pragma_listener(pragmas):
+    """
+    Build an engine connect listener that applies SQLite pragmas.
+    
+    Args:
+        pragmas (dict): Pragma names mapped to their values
+        
+    Returns:
+        callable: Listener for the engine's 'connect' event
+    """
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return set_pragmas
+
+def create_app(background_workers=True):
+    """
+    Create the Flask application.
+    
+    Args:
+        background_workers (bool): Start the upload job queue and the optional
+            model and video warm-up threads; command-line tools that only use
+            the database and models pass False
+    
+    Returns:
+        Flask: The application
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
     
@@ -17,16 +47,53 @@ def create_app():
     
     # Initialize database
     db.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', _sqlite_pragma_listener(app.config['SQLITE_PRAGMAS']))
+    
+    # Record per-route latency and stage timings for /metrics
+    from app.utils.metrics import metrics
+    metrics.init_app(app)
+    
+    # Cache statistics responses until feedback is stored
+    from app.utils.stats_cache import stats_cache
+    stats_cache.init_app(app)
+    
+    # Compress JSON, NDJSON and text responses for clients that accept it
+    from app.utils.compression import compressor
+    compressor.init_app(app)
     
     # Register blueprints
     from app.routes import main
     app.register_blueprint(main)
     
-    # Create database tables
-    with app.app_context():
-        # Drop all tables first
-        db.drop_all()
-        # Create all tables
-        db.create_all()
+    # Models are created lazily on first use; optionally load them in the background now
+    from app.utils import registry
+    registry.configure(app.config)
+    if background_workers and app.config['MODEL_WARMUP']:
+        registry.start_warm_up()
+    
+    # Render the sentiment videos in the background so the first requests don't have to
+    if background_workers and app.config['VIDEO_PREBUILD']:
+        threading.Thread(
+            target=lambda: registry.get_video_generator().warm_cache(app.config['VIDEO_DURATION']),
+            daemon=True
+        ).start()
+    
+    # Register CLI commands
+    from app.commands import db_cli, rollups_cli
+    app.cli.add_command(db_cli)
+    app.cli.add_command(rollups_cli)
+    
+    # Bring the schema up to date; existing feedback is kept across restarts
+    if app.config['DB_MIGRATE_ON_STARTUP']:
+        from app.migrations import upgrade
+        with app.app_context():
+            upgrade()
+    
+    # Start the background upload worker pool
+    if background_workers:
+        from app.utils.job_queue import job_queue
+        job_queue.init_app(app)
     
     return app 
\ No newline at end of file
@@ -0,0 +1,35 @@
+import click
+from flask.cli import AppGroup
+from app.models.rollup import rebuild_rollups
+from app import migrations
+
+db_cli = AppGroup('db', help='Manage the database schema.')
+rollups_cli = AppGroup('rollups', help='Manage pre-aggregated sentiment statistics.')
+
+@db_cli.command('upgrade')
+@click.option('--to', 'target', type=int, help='Stop after this schema version.')
+def upgrade_command(target):
+    """Apply pending schema migrations."""
+    applied = migrations.upgrade(target=target)
+    click.echo(f"Applied migrations: {', '.join(map(str, applied))}" if applied else "Schema is up to date")
+
+@db_cli.command('status')
+def status_command():
+    """Show the schema version and pending migrations."""
+    click.echo(f"Schema version: {migrations.current_version()}")
+    for number, description in migrations.pending_migrations():
+        click.echo(f"Pending: {number} {description}")
+
+@db_cli.command('reset')
+@click.confirmation_option(prompt='This deletes all feedback, statistics and jobs. Continue?')
+def reset_command():
+    """Drop all tables and recreate an empty schema."""
+    migrations.reset()
+    click.echo(f"Database reset to schema version {migrations.current_version()}")
+
+@rollups_cli.command('rebuild')
+@click.option('--batch-size', default=10000, show_default=True, help='Feedback rows read at a time.')
+def rebuild_rollups_command(batch_size):
+    """Recompute all rollup buckets from the feedback table."""
+    total = rebuild_rollups(batch_size=batch_size)
+    click.echo(f"Rebuilt rollups from {total} feedback entries")
\ No newline at end of file
@@ -0,0 +1,252 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String, bindparam, delete, inspect, select, text, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app import db
+# Imported so their tables are registered on db.metadata
+from app.models import checkpoint, feedback, job, rollup  # noqa: F401
+
+# One row per applied migration
+schema_version = db.Table(
+    'schema_version',
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+def has_column(connection, table, column):
+    """
+    Check whether a table already has a column.
+    
+    Args:
+        connection (Connection): Connection the migration runs on
+        table (str): Table name
+        column (str): Column name
+    
+    Returns:
+        bool: True if the column exists
+    """
+    return column in {info['name'] for info in inspect(connection).get_columns(table)}
+
+def create_index(connection, index):
+    """
+    Create an index unless it already exists.
+    
+    Args:
+        connection (Connection): Connection the migration runs on
+        index (Index): Index declared on a model's table
+    """
+    index.create(connection, checkfirst=True)
+
+def _baseline(connection):
+    # Creates the tables (and their indexes) that don't exist yet; existing tables are left alone
+    db.metadata.create_all(connection)
+
+def _feedback_content_hash(connection, batch_size=1000):
+    # Add the column, index it, then hash existing rows in id order. Only the
+    # first copy of each feedback gets a hash, so the unique index holds and
+    # later duplicates stay in the table (and in the statistics) untouched.
+    table = feedback.Feedback.__table__
+    if not has_column(connection, 'upload_jobs', 'rows_skipped'):
+        connection.execute(text('ALTER TABLE upload_jobs ADD COLUMN rows_skipped INTEGER NOT NULL DEFAULT 0'))
+    if not has_column(connection, 'feedback', 'content_hash'):
+        connection.execute(text('ALTER TABLE feedback ADD COLUMN content_hash VARCHAR(64)'))
+    create_index(connection, next(index for index in table.indexes if index.name == 'ix_feedback_content_hash'))
+    
+    set_hash = update(table).where(table.c.id == bindparam('row_id')).values(content_hash=bindparam('hash'))
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.text, table.c.department)
+            .where(table.c.id > last_id, table.c.content_hash.is_(None))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        
+        updates = {}
+        for row in rows:
+            updates.setdefault(feedback.content_hash(row.text, row.department), row.id)
+        existing = set(connection.execute(
+            select(table.c.content_hash).where(table.c.content_hash.in_(list(updates)))
+        ).scalars())
+        params = [{'row_id': row_id, 'hash': digest} for digest, row_id in updates.items() if digest not in existing]
+        if params:
+            connection.execute(set_hash, params)
+
+def backfill_rollups(connection, granularities, batch_size=10000):
+    """
+    Recompute rollup buckets of some granularities from the feedback table.
+    
+    Existing buckets of those granularities are replaced. Only feedback
+    within the retention period of the coarsest one is read, and buckets
+    past their own retention are left out.
+    
+    Args:
+        connection (Connection): Connection the migration runs on
+        granularities (tuple): Granularities to recompute, coarsest last
+        batch_size (int): Number of feedback rows read at a time
+    """
+    table = rollup.SentimentRollup.__table__
+    source = feedback.Feedback.__table__
+    connection.execute(delete(table).where(table.c.granularity.in_(granularities)))
+    
+    def rows():
+        query = select(source.c.timestamp, source.c.department, source.c.sentiment, source.c.score, source.c.confidence)
+        cutoff = rollup.retention_cutoffs().get(granularities[-1])
+        if cutoff is not None:
+            query = query.where(source.c.timestamp >= cutoff)
+        for row in connection.execute(query.execution_options(yield_per=batch_size)):
+            yield row._asdict()
+    
+    values = rollup.rollup_values(rows(), granularities=granularities)
+    for offset in range(0, len(values), batch_size):
+        connection.execute(table.insert(), values[offset:offset + batch_size])
+
+def _minute_rollups(connection):
+    # Minute buckets only exist for feedback stored from now on, so fill them
+    # in for the retained period and drop fine buckets that have expired.
+    # Existing minute buckets are recomputed rather than added to.
+    for stmt in rollup.prune_statements():
+        connection.execute(stmt)
+    backfill_rollups(connection, ('minute',))
+
+def _job_dedupe(connection):
+    # Deduplication became a per-upload choice, recorded with each job
+    if not has_column(connection, 'upload_jobs', 'dedupe'):
+        connection.execute(text('ALTER TABLE upload_jobs ADD COLUMN dedupe BOOLEAN NOT NULL DEFAULT 0'))
+
+def _job_heartbeats(connection):
+    # Running jobs record their process and last progress, so a starting
+    # process only interrupts jobs whose owner has stopped
+    if not has_column(connection, 'upload_jobs', 'worker'):
+        connection.execute(text('ALTER TABLE upload_jobs ADD COLUMN worker VARCHAR(100)'))
+    if not has_column(connection, 'upload_jobs', 'heartbeat_at'):
+        connection.execute(text('ALTER TABLE upload_jobs ADD COLUMN heartbeat_at DATETIME'))
+
+def _drop_department_index(connection):
+    # (department, timestamp) already serves department lookups, so the
+    # single-column index only slowed down inserts
+    if 'ix_feedback_department' in {index['name'] for index in inspect(connection).get_indexes('feedback')}:
+        connection.execute(text('DROP INDEX ix_feedback_department'))
+
+def _score_checkpoints(connection):
+    # score.py keeps the progress of database runs next to the rows, so
+    # both are committed together
+    checkpoint.ScoreCheckpoint.__table__.create(connection, checkfirst=True)
+
+def _feedback_indexes(connection):
+    # The baseline leaves existing tables alone, indexes included, so a
+    # feedback table created before the indexes were declared has none
+    for index in feedback.Feedback.__table__.indexes:
+        create_index(connection, index)
+
+def _existing_feedback_rollups(connection):
+    # Every stored feedback adds to a day bucket, so feedback without any
+    # day bucket predates the rollup table (created over it by the baseline)
+    table = rollup.SentimentRollup.__table__
+    source = feedback.Feedback.__table__
+    has_feedback = connection.execute(select(source.c.id).limit(1)).first() is not None
+    has_days = connection.execute(select(table.c.id).where(table.c.granularity == 'day').limit(1)).first() is not None
+    if has_feedback and not has_days:
+        backfill_rollups(connection, rollup.GRANULARITIES)
+
+# Ordered (version, description, function) entries. Migrations must be
+# idempotent: a fresh database gets the current models from the baseline,
+# so later migrations find their columns and indexes already in place.
+MIGRATIONS = [
+    (1, 'Baseline schema', _baseline),
+    (2, 'Content hashes for deduplicated uploads', _feedback_content_hash),
+    (3, 'Minute rollup buckets and retention', _minute_rollups),
+    (4, 'Feedback indexes on existing tables', _feedback_indexes),
+    (5, 'Rollups for feedback stored before the rollup table', _existing_feedback_rollups),
+    (6, 'Per-job deduplication setting', _job_dedupe),
+    (7, 'Job owners and heartbeats', _job_heartbeats),
+    (8, 'Drop the redundant feedback department index', _drop_department_index),
+    (9, 'Progress of score.py runs into the feedback table', _score_checkpoints),
+]
+
+def current_version():
+    """
+    Get the schema version of the database.
+    
+    Returns:
+        int: Highest applied migration, 0 for an empty database
+    """
+    with db.engine.connect() as connection:
+        if not inspect(connection).has_table(schema_version.name):
+            return 0
+        versions = connection.execute(select(schema_version.c.version)).scalars().all()
+    return max(versions, default=0)
+
+def pending_migrations():
+    """
+    List the migrations that have not been applied yet.
+    
+    Returns:
+        list: (version, description) pairs in the order they will run
+    """
+    version = current_version()
+    return [(number, description) for number, description, _ in MIGRATIONS if number > version]
+
+def upgrade(target=None):
+    """
+    Apply pending migrations, each in its own transaction.
+    
+    Several processes may start at once. On SQLite each transaction takes
+    the write lock before checking the version (BEGIN IMMEDIATE), so
+    processes apply migrations one at a time and skip those another one
+    recorded while they waited. Elsewhere, a migration that fails because
+    another process applied it first is skipped as well.
+    
+    Args:
+        target (int): Stop after this version, defaults to the latest
+    
+    Returns:
+        list: Versions applied by this call
+    """
+    applied = []
+    for number, description, migrate in MIGRATIONS:
+        if target is not None and number > target:
+            break
+        
+        try:
+            with db.engine.begin() as connection:
+                if connection.dialect.name == 'sqlite':
+                    connection.exec_driver_sql('BEGIN IMMEDIATE')
+                schema_version.create(connection, checkfirst=True)
+                done = connection.execute(
+                    select(schema_version.c.version).where(schema_version.c.version == number)
+                ).first()
+                if done:
+                    continue
+                
+                migrate(connection)
+                connection.execute(schema_version.insert(), {
+                    'version': number,
+                    'description': description,
+                    'applied_at': datetime.utcnow()
+                })
+                applied.append(number)
+        
+        except (IntegrityError, OperationalError):
+            # The transaction is rolled back; re-read which versions are applied
+            if current_version() < number:
+                raise
+            print(f"Migration {number} was applied by another process")
+    
+    return applied
+
+def reset():
+    """
+    Drop every table and rebuild the schema from scratch.
+    
+    This deletes all feedback, rollups and jobs.
+    
+    Returns:
+        list: Versions applied to the new schema
+    """
+    db.session.remove()
+    db.drop_all()
+    return upgrade()
\ No newline at end of file
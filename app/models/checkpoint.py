@@ -0,0 +1,9 @@
+from app import db
+from datetime import datetime
+
+class ScoreCheckpoint(db.Model):
+    __tablename__ = 'score_checkpoints'
+    
+    name = db.Column(db.String(255), primary_key=True)  # Identifies a score.py run storing into the feedback table
+    data = db.Column(db.Text, nullable=False)  # The run's progress as JSON, see batch_scoring.Checkpoint
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
\ No newline at end of file
@@ -1,16 +1,39 @@
 from app import db
+from app.utils.result_cache import normalize_text
 from datetime import datetime
+import hashlib
+
+def content_hash(text, department):
+    """
+    Get the identity of a piece of feedback for deduplicating uploads.
+    
+    Args:
+        text (str): The feedback text
+        department (str): The department it belongs to, if any
+        
+    Returns:
+        str: SHA-256 hex digest of the normalized text and department
+    """
+    content = f"{normalize_text(text)}\x00{normalize_text(department or '')}"
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
 class Feedback(db.Model):
     __tablename__ = 'feedback'
+    __table_args__ = (
+        # Serves department filters, with or without a time window
+        db.Index('ix_feedback_department_timestamp', 'department', 'timestamp'),
+        # Uploaded rows are stored once; NULL (feedback from /analyze) is never a conflict
+        db.Index('ix_feedback_content_hash', 'content_hash', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     text = db.Column(db.Text, nullable=False)
     department = db.Column(db.String(100))
-    sentiment = db.Column(db.String(20), nullable=False)
+    sentiment = db.Column(db.String(20), nullable=False, index=True)
     score = db.Column(db.Float, nullable=False)
     confidence = db.Column(db.Float, nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    content_hash = db.Column(db.String(64))  # See content_hash(); set for uploaded rows
 
     def to_dict(self):
         return {
@@ -0,0 +1,74 @@
+from app import db
+from datetime import datetime
+import json
+
+class UploadJob(db.Model):
+    __tablename__ = 'upload_jobs'
+    
+    id = db.Column(db.String(32), primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    total_rows = db.Column(db.Integer)
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+    rows_saved = db.Column(db.Integer, nullable=False, default=0)
+    rows_failed = db.Column(db.Integer, nullable=False, default=0)
+    rows_skipped = db.Column(db.Integer, nullable=False, default=0)  # Already stored by an earlier upload
+    dedupe = db.Column(db.Boolean, nullable=False, default=False)  # Skip rows that are already stored
+    worker = db.Column(db.String(100))  # host:pid of the process running the job
+    heartbeat_at = db.Column(db.DateTime)  # Last progress reported by that process
+    errors = db.Column(db.Text, nullable=False, default='[]')
+    summary = db.Column(db.Text)
+    error_message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def rows_per_second(self):
+        """
+        Get the processing rate of the job so far.
+        
+        Returns:
+            float: Rows processed per second, 0 if the job has not started
+        """
+        if not self.started_at or not self.rows_done:
+            return 0.0
+        elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return self.rows_done / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self):
+        """
+        Estimate the time left until the job completes.
+        
+        Returns:
+            float: Seconds remaining, or None if it cannot be estimated yet
+        """
+        if self.status == 'completed':
+            return 0.0
+        rate = self.rows_per_second()
+        if self.status != 'running' or not self.total_rows or not rate:
+            return None
+        return max(self.total_rows - self.rows_done, 0) / rate
+
+    def to_dict(self):
+        eta = self.eta_seconds()
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'status': self.status,
+            'total_rows': self.total_rows,
+            'rows_done': self.rows_done,
+            'rows_saved': self.rows_saved,
+            'rows_failed': self.rows_failed,
+            'rows_skipped': self.rows_skipped,
+            'dedupe': self.dedupe,
+            'worker': self.worker,
+            'progress': round(self.rows_done / self.total_rows, 3) if self.total_rows else None,
+            'rows_per_second': round(self.rows_per_second(), 1),
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'summary': json.loads(self.summary) if self.summary else None,
+            'error': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
\ No newline at end of file
@@ -0,0 +1,310 @@
+import threading
+import time
+from app import db
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from config import Config
+
+# Bucket sizes maintained for every feedback insert, finest first
+GRANULARITIES = ('minute', 'hour', 'day')
+
+# Intervals trends can be reported at; week and month are folded from day buckets
+INTERVALS = GRANULARITIES + ('week', 'month')
+
+BUCKET_SIZES = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1)
+}
+
+# How long fine buckets are kept once coarser ones cover the same period; day buckets are kept forever
+RETENTION = {
+    granularity: period
+    for granularity, period in (
+        ('minute', timedelta(hours=Config.ROLLUP_MINUTE_RETENTION_HOURS)),
+        ('hour', timedelta(days=Config.ROLLUP_HOUR_RETENTION_DAYS))
+    )
+    if period
+}
+
+class SentimentRollup(db.Model):
+    __tablename__ = 'sentiment_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('granularity', 'bucket_start', 'department', 'sentiment', name='uq_sentiment_rollup_bucket'),
+        db.Index('ix_sentiment_rollups_granularity_department', 'granularity', 'department', 'bucket_start'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    department = db.Column(db.String(100), nullable=False, default='')  # '' when no department was given
+    sentiment = db.Column(db.String(20), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+def truncate_timestamp(timestamp, granularity):
+    """
+    Get the start of the bucket a timestamp falls into.
+    
+    Args:
+        timestamp (datetime): The timestamp to truncate
+        granularity (str): One of INTERVALS (weeks start on Monday)
+        
+    Returns:
+        datetime: Start of the containing bucket
+    """
+    if granularity == 'minute':
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'week':
+        return truncate_timestamp(timestamp, 'day') - timedelta(days=timestamp.weekday())
+    if granularity == 'month':
+        return truncate_timestamp(timestamp, 'day').replace(day=1)
+    raise ValueError(f"Unknown rollup granularity: {granularity}")
+
+def source_granularity(interval):
+    """
+    Get the stored granularity an interval is computed from.
+    
+    Args:
+        interval (str): One of INTERVALS
+        
+    Returns:
+        str: One of GRANULARITIES
+    """
+    return interval if interval in GRANULARITIES else 'day'
+
+def retention_cutoffs(now=None):
+    """
+    Get the oldest bucket kept for each granularity with a retention period.
+    
+    Args:
+        now (datetime): Reference time, defaults to the current UTC time
+        
+    Returns:
+        dict: Granularity mapped to the earliest bucket_start that is kept
+    """
+    now = now or datetime.utcnow()
+    return {granularity: truncate_timestamp(now - period, granularity) for granularity, period in RETENTION.items()}
+
+def granularity_for_window(start, end=None, max_buckets=1440):
+    """
+    Pick the finest stored granularity that can answer a time window.
+    
+    A granularity qualifies when its buckets are still kept back to the
+    start of the window and the window spans at most max_buckets of them,
+    so queries stay small whatever the window.
+    
+    Args:
+        start (datetime): Start of the window, None for all time
+        end (datetime): End of the window, defaults to now
+        max_buckets (int): Upper bound on buckets per series
+        
+    Returns:
+        str: One of GRANULARITIES
+    """
+    if start is None:
+        return 'day'
+    end = end or datetime.utcnow()
+    cutoffs = retention_cutoffs()
+    for granularity in GRANULARITIES:
+        if granularity in cutoffs and truncate_timestamp(start, granularity) < cutoffs[granularity]:
+            continue
+        if (end - start) / BUCKET_SIZES[granularity] <= max_buckets:
+            return granularity
+    return 'day'
+
+def rollup_values(rows, granularities=GRANULARITIES, now=None):
+    """
+    Collapse feedback rows into per-bucket deltas.
+    
+    Buckets older than their granularity's retention are left out, so
+    backfilling old feedback only adds day (and recent hour) buckets.
+    
+    Args:
+        rows (iterable): Feedback column dictionaries with timestamp, department,
+            sentiment, score and confidence
+        granularities (tuple): Granularities to compute
+        now (datetime): Reference time for retention
+        
+    Returns:
+        list: Column values for the sentiment_rollups table, one per bucket
+    """
+    cutoffs = retention_cutoffs(now)
+    deltas = {}
+    for row in rows:
+        timestamp = row.get('timestamp') or datetime.utcnow()
+        for granularity in granularities:
+            bucket_start = truncate_timestamp(timestamp, granularity)
+            if granularity in cutoffs and bucket_start < cutoffs[granularity]:
+                continue
+            key = (granularity, bucket_start, row.get('department') or '', row['sentiment'])
+            delta = deltas.setdefault(key, [0, 0.0, 0.0])
+            delta[0] += 1
+            delta[1] += row['score']
+            delta[2] += row['confidence']
+    
+    return [
+        {
+            'granularity': granularity,
+            'bucket_start': bucket_start,
+            'department': department,
+            'sentiment': sentiment,
+            'count': count,
+            'score_sum': score_sum,
+            'confidence_sum': confidence_sum
+        }
+        for (granularity, bucket_start, department, sentiment), (count, score_sum, confidence_sum) in deltas.items()
+    ]
+
+def apply_rollups(rows):
+    """
+    Add feedback rows to the rollup buckets in the current transaction.
+    
+    Rows are first collapsed into per-bucket deltas, so the number of
+    upserts depends on the number of distinct buckets touched rather than
+    the number of rows. Expired fine buckets are pruned at most once per
+    ROLLUP_PRUNE_INTERVAL. The caller commits.
+    
+    Args:
+        rows (list): Feedback column dictionaries with timestamp, department,
+            sentiment, score and confidence
+    """
+    values = rollup_values(rows)
+    if not values:
+        return
+    
+    table = SentimentRollup.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        insert = None
+    
+    # Lets the statistics cache drop its entries once the transaction commits
+    db.session.info['rollups_changed'] = True
+    if insert is None:
+        _apply_rollups_portable(values)
+    else:
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['granularity', 'bucket_start', 'department', 'sentiment'],
+            set_={
+                'count': table.c.count + stmt.excluded.count,
+                'score_sum': table.c.score_sum + stmt.excluded.score_sum,
+                'confidence_sum': table.c.confidence_sum + stmt.excluded.confidence_sum
+            }
+        )
+        db.session.execute(stmt, values)
+    _prune_if_due()
+
+def _apply_rollups_portable(values):
+    """Apply rollup deltas with plain SELECT/UPDATE for databases without upsert support."""
+    for value in values:
+        rollup = SentimentRollup.query.filter_by(
+            granularity=value['granularity'],
+            bucket_start=value['bucket_start'],
+            department=value['department'],
+            sentiment=value['sentiment']
+        ).first()
+        if rollup is None:
+            db.session.add(SentimentRollup(**value))
+        else:
+            rollup.count += value['count']
+            rollup.score_sum += value['score_sum']
+            rollup.confidence_sum += value['confidence_sum']
+    db.session.flush()
+
+def prune_statements(now=None):
+    """
+    Build DELETE statements for buckets past their retention.
+    
+    Args:
+        now (datetime): Reference time, defaults to the current UTC time
+        
+    Returns:
+        list: One DELETE per granularity with a retention period
+    """
+    table = SentimentRollup.__table__
+    return [
+        delete(table).where(table.c.granularity == granularity, table.c.bucket_start < cutoff)
+        for granularity, cutoff in retention_cutoffs(now).items()
+    ]
+
+def prune_rollups(now=None):
+    """
+    Delete minute and hour buckets past their retention in the current transaction.
+    
+    The same period stays covered by coarser buckets. The caller commits.
+    
+    Args:
+        now (datetime): Reference time, defaults to the current UTC time
+        
+    Returns:
+        int: Number of buckets deleted
+    """
+    deleted = sum(db.session.execute(stmt).rowcount for stmt in prune_statements(now))
+    if deleted:
+        db.session.info['rollups_changed'] = True
+    return deleted
+
+_prune_lock = threading.Lock()
+_last_pruned = None
+
+def _prune_if_due():
+    global _last_pruned
+    with _prune_lock:
+        if _last_pruned is not None and time.monotonic() - _last_pruned < Config.ROLLUP_PRUNE_INTERVAL:
+            return
+        _last_pruned = time.monotonic()
+    prune_rollups()
+
+def rebuild_rollups(batch_size=10000):
+    """
+    Recompute every rollup bucket from the feedback table.
+    
+    Used to backfill after importing data outside the application. Runs
+    as a single transaction so readers never see a partial rebuild.
+    
+    Args:
+        batch_size (int): Number of feedback rows read at a time
+        
+    Returns:
+        int: Number of feedback rows rolled up
+    """
+    from app.models.feedback import Feedback
+    
+    try:
+        db.session.query(SentimentRollup).delete()
+        
+        query = db.session.query(
+            Feedback.timestamp,
+            Feedback.department,
+            Feedback.sentiment,
+            Feedback.score,
+            Feedback.confidence
+        ).execution_options(yield_per=batch_size)
+        
+        total = 0
+        batch = []
+        for row in query:
+            batch.append(row._asdict())
+            if len(batch) >= batch_size:
+                apply_rollups(batch)
+                total += len(batch)
+                batch = []
+        apply_rollups(batch)
+        total += len(batch)
+        
+        db.session.commit()
+        return total
+        
+    except Exception:
+        db.session.rollback()
+        raise
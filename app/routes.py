@@ -1,54 +1,112 @@
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, current_app, send_from_directory, url_for, Response, stream_with_context
 from app.models.feedback import Feedback
-from app.utils.sentiment_analyzer import SentimentAnalyzer
-from app.utils.avatar_generator import AvatarGenerator
-from app.utils.video_generator import VideoGenerator
-from app.utils.file_processor import process_csv
+from app.models.job import UploadJob
+from app.models.rollup import (
+    SentimentRollup, INTERVALS, granularity_for_window, retention_cutoffs, source_granularity, truncate_timestamp
+)
+from app.utils import registry
+from app.utils.file_processor import ingest_file, iter_ingest_file, RESULT_MODES
+from app.utils.readers import detect_format
+from app.utils.job_queue import job_queue
+from app.utils.metrics import metrics
+from app.utils.feedback_writer import FeedbackWriter
+from app.utils.stages import StageTimings, run_timed, wait_for_stage
+from app.utils.stats_cache import stats_cache
+from app.utils.compression import compressor
 from app import db
+from config import Config
+import base64
 import os
-from datetime import datetime
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func
 
 main = Blueprint('main', __name__)
-sentiment_analyzer = SentimentAnalyzer()
-avatar_generator = AvatarGenerator()
-video_generator = VideoGenerator()
+media_executor = ThreadPoolExecutor(max_workers=Config.MEDIA_WORKERS, thread_name_prefix='media')
 
 @main.route('/')
 def index():
     return render_template('index.html')
 
+def _media_urls(avatar_path, video_path):
+    """
+    Build the URLs of cached media files.
+    
+    Args:
+        avatar_path (str): Path of the avatar file, or None
+        video_path (str): Path of the video file, or None
+        
+    Returns:
+        dict: 'avatar_url' and 'video_url', None for media that is unavailable
+    """
+    return {
+        'avatar_url': url_for('main.get_avatar', filename=os.path.basename(avatar_path)) if avatar_path else None,
+        'video_url': url_for('main.get_video', filename=os.path.basename(video_path)) if video_path else None
+    }
+
+def _submit_media(category):
+    """
+    Start avatar and video generation for a category on the media executor.
+    
+    Args:
+        category (str): The sentiment category
+        
+    Returns:
+        tuple: (avatar future, video future), each resolving to (path, milliseconds)
+    """
+    return (
+        media_executor.submit(run_timed, registry.get_avatar_generator().get_avatar_path, category),
+        media_executor.submit(run_timed, registry.get_video_generator().get_video_path, category, current_app.config['VIDEO_DURATION'])
+    )
+
+@main.route('/ready')
+def readiness():
+    # Report ready only once the sentiment model is loaded, so traffic can wait for warm-up.
+    # Until then every probe makes sure a load is under way: without MODEL_WARMUP nothing
+    # else would start one before traffic arrives, and a failed warm-up is tried again.
+    ready = registry.is_loaded('sentiment_analyzer')
+    if not ready:
+        registry.start_warm_up()
+    return jsonify({
+        'ready': ready,
+        'components': registry.status(),
+        'warm_up': registry.warm_up_status()
+    }), 200 if ready else 503
+
 @main.route('/analyze', methods=['POST'])
 def analyze_sentiment():
     try:
+        timings = StageTimings()
+        request_start = time.perf_counter()
+        
         data = request.get_json()
         text = data.get('text', '')
         department = data.get('department', '')
+        defer_media = data.get('media') == 'deferred' or request.args.get('media') == 'deferred'
         
         if not text:
             return jsonify({'error': 'No text provided'}), 400
             
         # Analyze sentiment
-        result = sentiment_analyzer.analyze_sentiment(text)
+        with timings.measure('sentiment'):
+            if current_app.config['MICRO_BATCH_ENABLED']:
+                result = registry.get_micro_batcher().analyze_sentiment(text)
+            else:
+                result = registry.get_sentiment_analyzer().analyze_sentiment(text)
         
         if not result or 'error' in result:
             return jsonify({'error': 'Failed to analyze sentiment'}), 500
             
-        # Generate avatar
-        avatar_data = avatar_generator.generate_avatar(result['category'])
-        
-        # Generate video
-        video_data = video_generator.generate_video(result['category'])
+        # Avatar and video only depend on the category, so they run concurrently
+        # with each other and with the database write
+        avatar_future, video_future = _submit_media(result['category'])
         
         # Save to database
-        feedback = Feedback(
-            text=text,
-            department=department,
-            sentiment=result['category'],
-            score=result['score'],
-            confidence=result['confidence']
-        )
-        db.session.add(feedback)
-        db.session.commit()
+        with timings.measure('db'):
+            FeedbackWriter().write([FeedbackWriter.build_row(text, department, result)])
         
         # Format response
         response = {
@@ -58,17 +116,111 @@ def analyze_sentiment():
             'description': result['description'],
             'score': round(result['score'], 3),
             'confidence': round(result['confidence'], 3),
-            'department': department,
-            'avatar': avatar_data,
-            'video': video_data
+            'department': department
         }
         
-        return jsonify(response)
+        if defer_media:
+            # Media keeps rendering in the background; the client fetches it later
+            response['media_url'] = url_for('main.get_media', category=result['category'])
+        else:
+            avatar_path = wait_for_stage(avatar_future, 'avatar', current_app.config['AVATAR_TIMEOUT'], timings)
+            video_path = wait_for_stage(video_future, 'video', current_app.config['VIDEO_TIMEOUT'], timings)
+            response.update(_media_urls(avatar_path, video_path))
+        
+        timings.record('total', (time.perf_counter() - request_start) * 1000)
+        http_response = jsonify(response)
+        http_response.headers['Server-Timing'] = timings.server_timing_header()
+        return http_response
         
     except Exception as e:
         print(f"Error in analyze_sentiment: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@main.route('/media/<category>')
+def get_media(category):
+    try:
+        if category not in registry.get_avatar_generator().sentiment_prompts:
+            return jsonify({'error': 'Unknown sentiment category'}), 404
+            
+        timings = StageTimings()
+        avatar_future, video_future = _submit_media(category)
+        avatar_path = wait_for_stage(avatar_future, 'avatar', current_app.config['AVATAR_TIMEOUT'], timings)
+        video_path = wait_for_stage(video_future, 'video', current_app.config['VIDEO_TIMEOUT'], timings)
+        
+        response = jsonify({'category': category, **_media_urls(avatar_path, video_path)})
+        response.headers['Server-Timing'] = timings.server_timing_header()
+        return response
+        
+    except Exception as e:
+        print(f"Error in get_media: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@main.route('/media/avatars/<path:filename>')
+def get_avatar(filename):
+    # File names change whenever the avatar does, so clients may cache them indefinitely
+    response = send_from_directory(current_app.config['AVATAR_CACHE_FOLDER'], filename, max_age=31536000)
+    response.cache_control.immutable = True
+    return response
+
+@main.route('/media/videos/<path:filename>')
+def get_video(filename):
+    # File names change whenever the video does, so clients may cache them indefinitely
+    response = send_from_directory(current_app.config['VIDEO_CACHE_FOLDER'], filename, max_age=31536000)
+    response.cache_control.immutable = True
+    return response
+
+def _upload_response(summary):
+    """
+    Build the body of an /upload response from an ingest_file summary.
+    
+    Args:
+        summary (dict): Summary returned by ingest_file
+        
+    Returns:
+        dict: Message, row counts, row errors, category totals and timings
+    """
+    return {
+        'message': f"Successfully processed {summary['processed']} feedback entries",
+        'analyzed': summary['analyzed'],
+        'skipped': summary['skipped'],
+        'saved': summary['saved'],
+        'failed': summary['failed'],
+        'errors': summary['errors'],
+        'summary': summary['summary'],
+        'performance': summary['performance'],
+        'cache': summary['cache']
+    }
+
+def _stream_upload(file_path, options):
+    """
+    Analyze an upload and write its results as newline-delimited JSON.
+    
+    Every analyzed row becomes one line as soon as its chunk is stored, with
+    failed rows as {"row", "error"} lines in between; the last line is the
+    usual upload summary with "done": true. Only one chunk of results is
+    held at a time however large the file is. The status is sent before
+    the file is processed, so an error part-way through is reported as a
+    final {"error"} line.
+    
+    Args:
+        file_path (str): Copy of the uploaded file, deleted by the caller
+        options (dict): Keyword arguments for iter_ingest_file
+        
+    Yields:
+        str: Lines of JSON, one chunk of rows at a time
+    """
+    try:
+        for kind, payload in iter_ingest_file(file_path, **options):
+            if kind == 'rows':
+                if payload:
+                    yield ''.join(json.dumps(row) + '\n' for row in payload)
+            else:
+                yield json.dumps(dict(_upload_response(payload), done=True)) + '\n'
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error in upload_file: {str(e)}")
+        yield json.dumps({'error': str(e)}) + '\n'
+
 @main.route('/upload', methods=['POST'])
 def upload_file():
     try:
@@ -79,47 +231,348 @@ def upload_file():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
             
-        if not file.filename.endswith('.csv'):
-            return jsonify({'error': 'File must be a CSV'}), 400
+        try:
+            file_format = detect_format(file.filename)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+            
+        # Skipping rows that are already stored is opt-in per upload (?dedupe=true)
+        dedupe = request.args.get('dedupe', str(current_app.config['UPLOAD_DEDUPE'])).lower() == 'true'
+        
+        # In async mode the analysis runs on the job queue and is polled via /jobs/<id>
+        if request.args.get('async', 'false').lower() == 'true':
+            job = job_queue.submit(file, dedupe=dedupe)
+            return jsonify({
+                'message': 'Upload queued for processing',
+                'job_id': job.id,
+                'status_url': f'/jobs/{job.id}'
+            }), 202
             
-        # Process CSV file
-        feedback_data = process_csv(file)
+        # Per-row results are opt-in: ?results=page&offset=&limit=, ?results=full or ?results=stream
+        results_mode = request.args.get('results', 'summary').lower()
+        if results_mode == 'false':
+            results_mode = 'none'
+        if results_mode not in RESULT_MODES:
+            return jsonify({'error': f"results must be one of {', '.join(RESULT_MODES)}"}), 400
+        try:
+            results_offset = max(int(request.args.get('offset', 0)), 0)
+            results_limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+        except ValueError:
+            return jsonify({'error': 'offset and limit must be integers'}), 400
         
-        # Analyze sentiments
-        results = sentiment_analyzer.analyze_bulk([item['feedback'] for item in feedback_data])
+        options = {
+            'file_format': file_format,
+            'chunk_size': current_app.config['UPLOAD_CHUNK_SIZE'],
+            'write_batch_size': current_app.config['DB_WRITE_BATCH_SIZE'],
+            'results_mode': results_mode,
+            'results_offset': results_offset,
+            'results_limit': results_limit,
+            'dedupe': dedupe
+        }
+        if results_mode == 'stream':
+            # The request's files are closed once this view returns, before the
+            # body is generated, so the stream reads a copy spooled to disk
+            handle, file_path = tempfile.mkstemp(suffix=os.path.splitext(file.filename)[1].lower())
+            with os.fdopen(handle, 'wb') as copy:
+                file.save(copy)
+            response = Response(stream_with_context(_stream_upload(file_path, options)), mimetype='application/x-ndjson')
+            # Runs when the server closes the response, even if the client left before the body started
+            response.call_on_close(lambda: os.remove(file_path))
+            return response
         
-        # Save to database
-        for item, result in zip(feedback_data, results):
-            if not result or 'error' in result:
-                continue
-                
-            feedback = Feedback(
-                text=item['feedback'],
-                department=item.get('department', ''),
-                sentiment=result['category'],
-                score=result['score'],
-                confidence=result['confidence']
-            )
-            db.session.add(feedback)
-        db.session.commit()
+        # Stream, analyze and store the file one chunk at a time
+        summary = ingest_file(file, **options)
+        
+        response = _upload_response(summary)
+        if results_mode == 'page':
+            response['results'] = summary['results']
+            # Pages cover every row that reached the analyzer, failed ones included
+            response['page'] = {'offset': results_offset, 'limit': results_limit, 'total': summary['analyzed'] + summary['failed']}
+        elif results_mode == 'full':
+            response['results'] = summary['results']
+        
+        return jsonify(response)
+        
+    except Exception as e:
+        print(f"Error in upload_file: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def _encode_cursor(feedback_id):
+    """Encode the position after a feedback row as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps({'id': feedback_id}).encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor):
+    """
+    Decode a cursor produced by _encode_cursor.
+    
+    Args:
+        cursor (str): The cursor from a previous page
         
+    Returns:
+        int: ID of the last row of that page
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        feedback_id = position['id']
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(feedback_id, int):
+        raise ValueError('Invalid cursor')
+    return feedback_id
+
+@main.route('/feedback')
+def list_feedback():
+    try:
+        # Keyset pagination: each page starts after the last ID of the previous
+        # one, so deep pages cost the same as the first and rows stored while a
+        # client is paging never shift or repeat entries
+        try:
+            limit = int(request.args.get('limit', current_app.config['FEEDBACK_PAGE_SIZE']))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        limit = min(max(limit, 1), current_app.config['FEEDBACK_MAX_PAGE_SIZE'])
+        
+        query = db.select(Feedback).order_by(Feedback.id.desc()).limit(limit + 1)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                query = query.where(Feedback.id < _decode_cursor(cursor))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        departments = request.args.getlist('department')
+        if departments:
+            query = query.where(Feedback.department.in_(departments))
+        if request.args.get('sentiment'):
+            query = query.where(Feedback.sentiment == request.args['sentiment'])
+        try:
+            start, end = _parse_time_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if start is not None:
+            query = query.where(Feedback.timestamp >= start)
+        if end is not None:
+            query = query.where(Feedback.timestamp < end)
+        
+        rows = db.session.execute(query).scalars().all()
+        items = rows[:limit]
         return jsonify({
-            'message': f'Successfully processed {len(results)} feedback entries',
-            'results': results
+            'items': [row.to_dict() for row in items],
+            'next_cursor': _encode_cursor(items[-1].id) if len(rows) > limit else None
         })
         
     except Exception as e:
-        print(f"Error in upload_file: {str(e)}")
+        print(f"Error in list_feedback: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@main.route('/jobs/<job_id>')
+def get_job(job_id):
+    try:
+        job = db.session.get(UploadJob, job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+            
+        return jsonify(job.to_dict())
+        
+    except Exception as e:
+        print(f"Error in get_job: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@main.route('/jobs/<job_id>/errors')
+def get_job_errors(job_id):
+    try:
+        job = db.session.get(UploadJob, job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+            
+        return jsonify({
+            'id': job.id,
+            'rows_failed': job.rows_failed,
+            'errors': json.loads(job.errors)
+        })
+        
+    except Exception as e:
+        print(f"Error in get_job_errors: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def _parse_time_filters(args):
+    """
+    Parse the time window of a statistics query.
+    
+    Accepts either 'window' (a duration such as 30m, 24h or 7d, ending now)
+    or ISO 8601 'start' and/or 'end' timestamps.
+    
+    Args:
+        args: Request query arguments
+        
+    Returns:
+        tuple: (start, end) datetimes, either of which may be None
+        
+    Raises:
+        ValueError: If the window or a timestamp cannot be parsed
+    """
+    window = args.get('window')
+    if window:
+        units = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+        unit = units.get(window[-1:].lower())
+        if unit is None or not window[:-1].isdigit():
+            raise ValueError("window must look like 30m, 24h, 7d or 4w")
+        end = datetime.utcnow()
+        try:
+            return end - timedelta(**{unit: int(window[:-1])}), end
+        except OverflowError:
+            raise ValueError("window is too long")
+        
+    return _parse_timestamp(args, 'start'), _parse_timestamp(args, 'end')
+
+def _parse_timestamp(args, name):
+    """
+    Parse an ISO 8601 query argument as a naive UTC datetime.
+    
+    Stored timestamps are naive UTC, so timestamps with an offset are
+    converted to UTC and their offset dropped before they are compared.
+    
+    Args:
+        args: Request query arguments
+        name (str): Name of the argument
+        
+    Returns:
+        datetime: The timestamp, or None if the argument is not given
+        
+    Raises:
+        ValueError: If the argument is not an ISO 8601 timestamp
+    """
+    if not args.get(name):
+        return None
+    try:
+        value = datetime.fromisoformat(args[name])
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    except (ValueError, OverflowError):
+        raise ValueError(f"{name} must be an ISO 8601 timestamp")
+    return value
+
+def _rollup_filters(interval, args, start=None, end=None):
+    """
+    Build rollup filters from the department and time window of a query.
+    
+    Time windows are applied at bucket resolution: a bucket is included
+    when it starts inside the window or contains its start. Several
+    departments can be given as repeated 'department' arguments.
+    
+    Args:
+        interval (str): Interval being reported, one of INTERVALS
+        args: Request query arguments
+        start (datetime): Start of the window, if already parsed
+        end (datetime): End of the window, if already parsed
+        
+    Returns:
+        list: SQLAlchemy filter expressions
+    
+    Raises:
+        ValueError: If the window starts before the buckets needed are kept
+    """
+    if start is None and end is None:
+        start, end = _parse_time_filters(args)
+    granularity = source_granularity(interval)
+    filters = [SentimentRollup.granularity == granularity]
+    departments = args.getlist('department')
+    if departments:
+        filters.append(SentimentRollup.department.in_(departments))
+    if start:
+        cutoff = retention_cutoffs().get(granularity)
+        if cutoff is not None and truncate_timestamp(start, granularity) < cutoff:
+            raise ValueError(f"{granularity} buckets are only kept since {cutoff.isoformat()}; use a coarser interval")
+        filters.append(SentimentRollup.bucket_start >= truncate_timestamp(start, interval))
+    if end:
+        filters.append(SentimentRollup.bucket_start < end)
+    return filters
+
+def _rollup_series(interval, filters, by_department=False):
+    """
+    Read rollup buckets and fold them into a series at the requested interval.
+    
+    Week and month buckets are summed from day buckets, so the work depends
+    on the number of buckets in the window, never on the number of rows.
+    
+    Args:
+        interval (str): One of INTERVALS
+        filters (list): Filters from _rollup_filters
+        by_department (bool): Build one series per department
+        
+    Returns:
+        dict: Department (None when not split) mapped to its total, average
+            score and confidence, and the list of bucket dictionaries
+    """
+    columns = [SentimentRollup.bucket_start, SentimentRollup.sentiment]
+    if by_department:
+        columns.append(SentimentRollup.department)
+    rows = db.session.query(
+        *columns,
+        func.sum(SentimentRollup.count),
+        func.sum(SentimentRollup.score_sum),
+        func.sum(SentimentRollup.confidence_sum)
+    ).filter(*filters).group_by(*columns).all()
+    
+    # Fold per-sentiment rows into one entry per bucket (and department)
+    series = {}
+    for row in rows:
+        department = (row[2] or None) if by_department else None
+        count, score_sum, confidence_sum = row[-3:]
+        buckets = series.setdefault(department, {})
+        bucket = buckets.setdefault(truncate_timestamp(row[0], interval), {
+            'total': 0,
+            'score_sum': 0.0,
+            'confidence_sum': 0.0,
+            'sentiment_distribution': {}
+        })
+        bucket['total'] += count
+        bucket['score_sum'] += score_sum
+        bucket['confidence_sum'] += confidence_sum
+        bucket['sentiment_distribution'][row[1]] = bucket['sentiment_distribution'].get(row[1], 0) + count
+    
+    result = {}
+    for department, buckets in series.items():
+        total = sum(bucket['total'] for bucket in buckets.values())
+        result[department] = {
+            'total': total,
+            'average_score': round(sum(bucket['score_sum'] for bucket in buckets.values()) / total, 3),
+            'average_confidence': round(sum(bucket['confidence_sum'] for bucket in buckets.values()) / total, 3),
+            'buckets': [
+                {
+                    'bucket_start': bucket_start.isoformat(),
+                    'total': bucket['total'],
+                    'average_score': round(bucket['score_sum'] / bucket['total'], 3),
+                    'average_confidence': round(bucket['confidence_sum'] / bucket['total'], 3),
+                    'sentiment_distribution': bucket['sentiment_distribution']
+                }
+                for bucket_start, bucket in sorted(buckets.items())
+            ]
+        }
+    return result
+
 @main.route('/stats')
+@stats_cache.cached
 def get_stats():
     try:
-        # Get all feedback
-        feedbacks = Feedback.query.all()
+        # Windows use the finest bucket size that still covers them; without one, daily buckets suffice
+        try:
+            start, end = _parse_time_filters(request.args)
+            granularity = granularity_for_window(start, end) if start or end else 'day'
+            filters = _rollup_filters(granularity, request.args, start, end)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Calculate statistics
-        total = len(feedbacks)
+        # Read pre-aggregated buckets instead of the feedback table
+        rows = db.session.query(
+            SentimentRollup.sentiment,
+            func.sum(SentimentRollup.count),
+            func.sum(SentimentRollup.score_sum)
+        ).filter(*filters).group_by(SentimentRollup.sentiment).all()
+        
+        total = sum(count for _, count, _ in rows)
         if total == 0:
             return jsonify({
                 'total': 0,
@@ -127,13 +580,9 @@ def get_stats():
                 'sentiment_distribution': {}
             })
             
-        # Calculate average score
-        avg_score = sum(f.score for f in feedbacks) / total
-        
-        # Calculate sentiment distribution
-        sentiment_dist = {}
-        for feedback in feedbacks:
-            sentiment_dist[feedback.sentiment] = sentiment_dist.get(feedback.sentiment, 0) + 1
+        # Calculate average score and sentiment distribution
+        avg_score = sum(score_sum for _, _, score_sum in rows) / total
+        sentiment_dist = {sentiment: count for sentiment, count, _ in rows}
             
         return jsonify({
             'total': total,
@@ -143,4 +592,83 @@ def get_stats():
         
     except Exception as e:
         print(f"Error in get_stats: {str(e)}")
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@main.route('/stats/inference')
+def get_inference_stats():
+    try:
+        analyzer = registry.get_sentiment_analyzer() if registry.is_loaded('sentiment_analyzer') else None
+        # With BULK_WORKERS above 1, uploads run on the process pool rather than this analyzer
+        bulk_analyzer = registry.get_bulk_analyzer() if registry.is_loaded('bulk_analyzer') else analyzer
+        return jsonify({
+            'micro_batcher': registry.get_micro_batcher().stats() if registry.is_loaded('micro_batcher') else None,
+            'cache': analyzer.cache.stats() if analyzer is not None and analyzer.cache is not None else None,
+            'stats_cache': stats_cache.stats(),
+            'compression': compressor.stats(),
+            'last_bulk': bulk_analyzer.last_bulk_stats if bulk_analyzer is not None else None
+        })
+        
+    except Exception as e:
+        print(f"Error in get_inference_stats: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@main.route('/metrics')
+def get_metrics():
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@main.route('/stats/timeseries')
+@stats_cache.cached
+def get_stats_timeseries():
+    try:
+        interval = request.args.get('interval', 'day')
+        if interval not in INTERVALS:
+            return jsonify({'error': f"interval must be one of {', '.join(INTERVALS)}"}), 400
+        try:
+            filters = _rollup_filters(interval, request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'interval': interval,
+            'department': request.args.get('department'),
+            'buckets': _rollup_series(interval, filters).get(None, {'buckets': []})['buckets']
+        })
+        
+    except Exception as e:
+        print(f"Error in get_stats_timeseries: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@main.route('/stats/trends')
+@stats_cache.cached
+def get_stats_trends():
+    try:
+        interval = request.args.get('interval', 'month')
+        if interval not in INTERVALS:
+            return jsonify({'error': f"interval must be one of {', '.join(INTERVALS)}"}), 400
+        try:
+            filters = _rollup_filters(interval, request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        departments = []
+        for department, series in _rollup_series(interval, filters, by_department=True).items():
+            buckets = series.pop('buckets')
+            departments.append({
+                'department': department,
+                **series,
+                # Change in average score from the first to the last bucket of the window
+                'score_change': round(buckets[-1]['average_score'] - buckets[0]['average_score'], 3),
+                'buckets': buckets
+            })
+        departments.sort(key=lambda entry: (entry['department'] is None, entry['department'] or ''))
+        
+        return jsonify({
+            'interval': interval,
+            'departments': departments
+        })
+        
+    except Exception as e:
+        print(f"Error in get_stats_trends: {str(e)}")
+        return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,127 @@
+import base64
+import io
+import os
+from PIL import Image, ImageDraw
+
+def parse_size(size):
+    """
+    Parse an image size such as '1024x1024'.
+    
+    Args:
+        size (str): Width and height separated by 'x'
+        
+    Returns:
+        tuple: (width, height) in pixels
+    """
+    width, height = size.lower().split('x')
+    return int(width), int(height)
+
+class OpenAIAvatarBackend:
+    """Generate avatars with DALL-E 3. Requires network access and OPENAI_API_KEY."""
+    name = 'openai'
+
+    def __init__(self, api_key=None):
+        # Imported here so the local backend works without the OpenAI client installed
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'))
+
+    def render(self, sentiment_category, prompt, size):
+        """
+        Generate an avatar image.
+        
+        Args:
+            sentiment_category (str): The sentiment category
+            prompt (str): Description of the avatar
+            size (str): Image size such as '1024x1024'
+            
+        Returns:
+            bytes: PNG image data
+        """
+        response = self.client.images.generate(
+            model="dall-e-3",
+            prompt=prompt,
+            size=size,
+            quality="standard",
+            n=1,
+            response_format="b64_json"
+        )
+        return base64.b64decode(response.data[0].b64_json)
+
+class LocalAvatarBackend:
+    """Draw simple procedural avatars with Pillow, without any network access."""
+    name = 'local'
+
+    # Background color, face color and mouth curvature (-1 frown to 1 smile) per category
+    styles = {
+        'VERY_POSITIVE': ((255, 196, 61), (255, 224, 140), 1.0),
+        'POSITIVE': ((129, 199, 132), (255, 224, 178), 0.5),
+        'NEUTRAL': ((176, 190, 197), (240, 220, 200), 0.0),
+        'NEGATIVE': ((121, 134, 203), (225, 210, 200), -0.5),
+        'VERY_NEGATIVE': ((69, 90, 100), (200, 195, 190), -1.0)
+    }
+
+    def render(self, sentiment_category, prompt, size):
+        """
+        Draw an avatar image.
+        
+        Args:
+            sentiment_category (str): The sentiment category
+            prompt (str): Description of the avatar (unused; the style is per category)
+            size (str): Image size such as '1024x1024'
+            
+        Returns:
+            bytes: PNG image data
+        """
+        width, height = parse_size(size)
+        background, skin, curvature = self.styles.get(sentiment_category, self.styles['NEUTRAL'])
+        
+        image = Image.new('RGB', (width, height), background)
+        draw = ImageDraw.Draw(image)
+        unit = min(width, height) / 10
+        cx, cy = width / 2, height / 2
+        line = max(int(unit / 4), 1)
+        
+        # Face
+        draw.ellipse([cx - 4 * unit, cy - 4 * unit, cx + 4 * unit, cy + 4 * unit], fill=skin, outline=(60, 60, 60), width=line)
+        
+        # Eyes
+        for dx in (-1.5 * unit, 1.5 * unit):
+            draw.ellipse([cx + dx - 0.4 * unit, cy - 1.6 * unit, cx + dx + 0.4 * unit, cy - 0.8 * unit], fill=(40, 40, 40))
+        
+        # Mouth: a flat line for neutral, otherwise an arc bending up or down
+        mouth_y = cy + 1.6 * unit
+        if curvature == 0:
+            draw.line([cx - 1.5 * unit, mouth_y, cx + 1.5 * unit, mouth_y], fill=(60, 60, 60), width=line)
+        else:
+            depth = abs(curvature) * 1.2 * unit
+            box = [cx - 2 * unit, mouth_y - depth, cx + 2 * unit, mouth_y + depth]
+            start, end = (20, 160) if curvature > 0 else (200, 340)
+            if curvature < 0:
+                box = [box[0], box[1] + depth, box[2], box[3] + depth]
+            draw.arc(box, start, end, fill=(60, 60, 60), width=line)
+        
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        return buffer.getvalue()
+
+AVATAR_BACKENDS = {
+    OpenAIAvatarBackend.name: OpenAIAvatarBackend,
+    LocalAvatarBackend.name: LocalAvatarBackend
+}
+
+def create_avatar_backend(name=None):
+    """
+    Create an avatar backend by name.
+    
+    Args:
+        name (str): 'openai' or 'local'; defaults to OpenAI when an API key is
+            configured and to the local generator otherwise
+            
+    Returns:
+        object: Backend with a render(sentiment_category, prompt, size) method
+    """
+    if not name:
+        name = 'openai' if os.getenv('OPENAI_API_KEY') else 'local'
+    if name not in AVATAR_BACKENDS:
+        raise ValueError(f"Unknown avatar backend '{name}', expected one of {', '.join(AVATAR_BACKENDS)}")
+    return AVATAR_BACKENDS[name]()
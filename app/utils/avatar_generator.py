@@ -1,12 +1,21 @@
 import os
-from openai import OpenAI
 from PIL import Image
 import io
 import base64
+import hashlib
+import threading
+from app.utils.avatar_backends import create_avatar_backend
+from app.utils.metrics import metrics
 
 class AvatarGenerator:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    def __init__(self, backend=None, cache_dir='static/avatars', size='1024x1024'):
+        # Backend that renders avatars, e.g. DALL-E 3 or the offline Pillow generator
+        self.backend = backend or create_avatar_backend()
+        self.size = size
+        
+        # Rendered avatars are cached on disk and reused for every request
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
         
         # Define avatar prompts for different sentiments
         self.sentiment_prompts = {
@@ -16,40 +25,72 @@ class AvatarGenerator:
             'NEGATIVE': "Create a concerned and thoughtful avatar with a slightly worried expression and cooler colors. The avatar should look concerned but not extremely negative.",
             'VERY_NEGATIVE': "Create a serious and downcast avatar with a sad expression and dark colors. The avatar should look very concerned and negative."
         }
+        self._render_locks = {category: threading.Lock() for category in self.sentiment_prompts}
 
-    def generate_avatar(self, sentiment_category):
+    def get_avatar_path(self, sentiment_category):
         """
-        Generate an avatar based on the sentiment category using DALL-E 3.
+        Get the cached avatar for a sentiment category, generating it on first use.
+        
+        Avatars are keyed by backend, category, prompt and size, so changing
+        any of them produces a new file while every other request reuses the
+        existing one.
         
         Args:
             sentiment_category (str): The sentiment category (VERY_POSITIVE, POSITIVE, etc.)
             
         Returns:
-            str: Base64 encoded image data
+            str: Path of the PNG file, or None if it could not be generated
         """
         try:
-            # Get the appropriate prompt for the sentiment
-            prompt = self.sentiment_prompts.get(sentiment_category, self.sentiment_prompts['NEUTRAL'])
+            if sentiment_category not in self.sentiment_prompts:
+                sentiment_category = 'NEUTRAL'
+            prompt = self.sentiment_prompts[sentiment_category]
+            
+            key = hashlib.sha256(
+                f"{self.backend.name}|{sentiment_category}|{prompt}|{self.size}".encode('utf-8')
+            ).hexdigest()[:16]
+            avatar_path = os.path.join(self.cache_dir, f"{sentiment_category.lower()}_{key}.png")
             
-            # Generate image using DALL-E 3
-            response = self.client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size="1024x1024",
-                quality="standard",
-                n=1,
-                response_format="b64_json"
-            )
+            if os.path.exists(avatar_path):
+                if metrics.enabled:
+                    metrics.media_cache.inc('avatar', 'hit')
+                return avatar_path
             
-            # Get the base64 image data
-            image_data = response.data[0].b64_json
+            # Only one thread generates a given category; the others wait and reuse it
+            with self._render_locks[sentiment_category]:
+                if not os.path.exists(avatar_path):
+                    if metrics.enabled:
+                        metrics.media_cache.inc('avatar', 'miss')
+                    with metrics.timed('avatar', items=1):
+                        image_data = self.backend.render(sentiment_category, prompt, self.size)
+                    temp_path = f"{avatar_path}.{threading.get_ident()}.tmp"
+                    with open(temp_path, 'wb') as f:
+                        f.write(image_data)
+                    os.replace(temp_path, avatar_path)
             
-            return image_data
+            return avatar_path
             
         except Exception as e:
             print(f"Error generating avatar: {str(e)}")
             return None
 
+    def generate_avatar(self, sentiment_category):
+        """
+        Generate an avatar based on the sentiment category.
+        
+        Args:
+            sentiment_category (str): The sentiment category (VERY_POSITIVE, POSITIVE, etc.)
+            
+        Returns:
+            str: Base64 encoded image data
+        """
+        avatar_path = self.get_avatar_path(sentiment_category)
+        if avatar_path is None:
+            return None
+        
+        with open(avatar_path, 'rb') as image_file:
+            return base64.b64encode(image_file.read()).decode('utf-8')
+
     def save_avatar(self, base64_data, filename):
         """
         Save the avatar image to a file.
@@ -69,4 +110,4 @@ class AvatarGenerator:
             image.save(filename)
             
         except Exception as e:
-            print(f"Error saving avatar: {str(e)}") 
\ No newline at end of file
+            print(f"Error saving avatar: {str(e)}")
@@ -0,0 +1,442 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from sqlalchemy import delete
+from app import db
+from app.models.checkpoint import ScoreCheckpoint
+from app.utils.feedback_writer import FeedbackWriter
+from app.utils.readers import EXTENSIONS, count_rows, iter_feedback_batches
+
+# Columns written by the CSV and Parquet sinks
+OUTPUT_COLUMNS = ('source', 'row', 'feedback', 'department', 'sentiment', 'score', 'confidence', 'error')
+
+def find_input_files(paths):
+    """
+    Expand files and directories into the feedback files to score.
+    
+    Directories are searched recursively for supported extensions; files
+    are returned in a stable (sorted) order so runs are reproducible.
+    
+    Args:
+        paths (list): File and directory paths
+    
+    Returns:
+        list: Absolute paths of feedback files
+    
+    Raises:
+        ValueError: If a path does not exist
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(root, name) for name in names
+                    if os.path.splitext(name)[1].lower() in EXTENSIONS
+                )
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise ValueError(f"No such file or directory: {path}")
+    return sorted({os.path.abspath(path) for path in files})
+
+class Checkpoint:
+    def __init__(self, path, target):
+        """
+        Progress of a scoring run, saved as JSON after every flushed batch.
+        
+        Records how many rows of each input file have been written and the
+        state the output needs to be rolled back to, so an interrupted run
+        continues where its last flush ended.
+        
+        Args:
+            path (str): The checkpoint file
+            target (str): Where results go ('database' or the output path)
+        
+        Raises:
+            ValueError: If the checkpoint belongs to a run with another target
+        """
+        self.path = path
+        self.data = {'target': target, 'files': {}, 'output': None}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.data = json.load(f)
+            if self.data['target'] != target:
+                raise ValueError(f"{path} records a run writing to {self.data['target']}; use another --checkpoint")
+
+    def file_state(self, path):
+        """
+        Get the progress of an input file, checking it has not changed since.
+        
+        Args:
+            path (str): Absolute path of the input file
+        
+        Returns:
+            dict: rows_done and done for the file (zero and False if it is new)
+        
+        Raises:
+            ValueError: If a partly scored file was modified after the checkpoint
+        """
+        stat = os.stat(path)
+        state = self.data['files'].get(path)
+        if state is None:
+            return {'rows_done': 0, 'done': False}
+        if not state['done'] and (state['size'] != stat.st_size or state['mtime'] != stat.st_mtime):
+            raise ValueError(f"{path} changed since it was partly scored; rerun with --restart")
+        return state
+
+    def update(self, path, rows_done, done, output_state):
+        """
+        Record progress and save the checkpoint atomically.
+        
+        Args:
+            path (str): Absolute path of the input file
+            rows_done (int): Rows of the file whose results are written
+            done (bool): Whether the whole file is scored
+            output_state (dict): What the sink needs to resume, from its flush()
+        """
+        stat = os.stat(path)
+        self.data['files'][path] = {
+            'rows_done': rows_done,
+            'done': done,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'updated_at': datetime.utcnow().isoformat()
+        }
+        self.data['output'] = output_state
+        self._save()
+
+    def _save(self):
+        # Write then rename, so a crash never leaves a truncated checkpoint
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.path)
+
+class DatabaseCheckpoint(Checkpoint):
+    def __init__(self, name, legacy_path=None):
+        """
+        Progress of a run into the feedback table, kept in the score_checkpoints table.
+        
+        update() only adds the progress to the current transaction, and
+        DatabaseSink commits it together with the rows it covers, so an
+        interrupted run never stores a row the checkpoint doesn't record.
+        
+        Args:
+            name (str): Identifies the run; runs with different names keep separate progress
+            legacy_path (str): JSON checkpoint of a database run to take over
+                if this run has no stored progress yet
+        """
+        self.path = name
+        self.data = {'target': 'database', 'files': {}, 'output': None}
+        stored = db.session.get(ScoreCheckpoint, name)
+        if stored is not None:
+            self.data = json.loads(stored.data)
+        elif legacy_path is not None and os.path.exists(legacy_path):
+            super().__init__(legacy_path, 'database')
+            self.path = name
+
+    def _save(self):
+        # Left for the sink to commit with the rows
+        db.session.merge(ScoreCheckpoint(name=self.path, data=json.dumps(self.data), updated_at=datetime.utcnow()))
+
+    def clear(self):
+        """Forget the progress of the run, so it starts over."""
+        db.session.execute(delete(ScoreCheckpoint).where(ScoreCheckpoint.name == self.path))
+        db.session.commit()
+        self.data = {'target': 'database', 'files': {}, 'output': None}
+
+class DatabaseSink:
+    def __init__(self, write_batch_size=1000, dedupe=False):
+        """
+        Store scored rows in the feedback table, like /upload does.
+        
+        Rows are buffered until flush(), which commits the last insert
+        batch together with a DatabaseCheckpoint. With write_batch_size at
+        least the rows buffered between checkpoints, the rows and the
+        progress covering them are one transaction, so a resumed run
+        neither stores rows twice nor misses any, with or without dedupe.
+        
+        Args:
+            write_batch_size (int): Rows per insert transaction
+            dedupe (bool): Skip rows whose text and department are already stored
+        """
+        self.writer = FeedbackWriter(batch_size=write_batch_size, skip_duplicates=dedupe)
+        self.dedupe = dedupe
+        self.buffer = []
+        self.buffered_hashes = set()
+
+    def resume(self, state):
+        """Nothing to roll back: unflushed rows were never committed."""
+
+    def prepare(self, rows):
+        """
+        Select the rows of a batch that need analysis.
+        
+        Args:
+            rows (list): Row dictionaries from the reader
+        
+        Returns:
+            tuple: List of (position, row, content hash) to analyze, and the number skipped
+        """
+        from app.models.feedback import content_hash
+        from app.utils.file_processor import find_stored_hashes
+        hashes = [content_hash(row['feedback'], row['department']) if row['feedback'].strip() else None for row in rows]
+        # Rows waiting in the buffer count as stored. As with /upload, the first copy of a
+        # row keeps its hash even without dedupe; further copies are skipped or stored without it
+        seen = find_stored_hashes({digest for digest in hashes if digest is not None}) | self.buffered_hashes
+        pending = []
+        for position, (row, digest) in enumerate(zip(rows, hashes)):
+            if digest is not None:
+                if digest not in seen:
+                    seen.add(digest)
+                    self.buffered_hashes.add(digest)
+                elif self.dedupe:
+                    continue
+                else:
+                    digest = None
+            pending.append((position, row, digest))
+        return pending, len(rows) - len(pending)
+
+    def write(self, source, first_row, pending, results):
+        self.buffer.extend(
+            FeedbackWriter.build_row(row['feedback'], row['department'], results.row(index), digest)
+            for index, (_, row, digest) in enumerate(pending)
+            if index not in results.errors
+        )
+
+    def flush(self, save):
+        """
+        Commit the buffered rows, saving the checkpoint in the same transaction.
+        
+        Args:
+            save (callable): Records the output state in the checkpoint
+        """
+        self.writer.write(self.buffer, before_commit=lambda: save(None))
+        self.buffer = []
+        self.buffered_hashes = set()
+
+    def close(self):
+        pass
+
+def _output_record(source, first_row, position, row, results, index):
+    """Build one CSV/Parquet output record from an analyzed row."""
+    error = results.errors.get(index)
+    result = results.row(index)
+    return {
+        'source': source,
+        'row': first_row + position,
+        'feedback': row['feedback'],
+        'department': row['department'],
+        'sentiment': None if error else result['category'],
+        'score': None if error else result['score'],
+        'confidence': None if error else result['confidence'],
+        'error': error
+    }
+
+class CsvSink:
+    def __init__(self, path):
+        """
+        Append scored rows to a CSV file with OUTPUT_COLUMNS.
+        
+        Args:
+            path (str): The output file
+        """
+        self.path = path
+        self.file = None
+        self.writer = None
+
+    def resume(self, state):
+        """
+        Open the output, dropping anything written after the last checkpoint.
+        
+        Args:
+            state (dict): Output state from the checkpoint, None for a fresh run
+        """
+        size = state['bytes'] if state else 0
+        self.file = open(self.path, 'a+', newline='', encoding='utf-8')
+        self.file.truncate(size)
+        self.file.seek(size)
+        self.writer = csv.DictWriter(self.file, fieldnames=OUTPUT_COLUMNS)
+        if size == 0:
+            self.writer.writeheader()
+
+    def prepare(self, rows):
+        return [(position, row, None) for position, row in enumerate(rows)], 0
+
+    def write(self, source, first_row, pending, results):
+        self.writer.writerows(
+            _output_record(source, first_row, position, row, results, index)
+            for index, (position, row, _) in enumerate(pending)
+        )
+
+    def flush(self, save):
+        """
+        Make the written rows durable, then save the checkpoint.
+        
+        Args:
+            save (callable): Records the output state in the checkpoint
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        save({'bytes': self.file.tell()})
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+class ParquetSink:
+    def __init__(self, path):
+        """
+        Write scored rows as a Parquet dataset: one part file per flush in a directory.
+        
+        Parquet files can't be appended to, so each checkpoint adds a part;
+        the directory reads as one table with pandas or pyarrow.
+        
+        Args:
+            path (str): The output directory, e.g. scores.parquet
+        """
+        self.path = path
+        self.parts = 0
+        self.buffer = []
+
+    def _part_path(self, number):
+        return os.path.join(self.path, f"part-{number:05d}.parquet")
+
+    def resume(self, state):
+        """
+        Create the output directory, removing parts written after the last checkpoint.
+        
+        Args:
+            state (dict): Output state from the checkpoint, None for a fresh run
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self.parts = state['parts'] if state else 0
+        for name in os.listdir(self.path):
+            if not name.startswith('part-'):
+                continue
+            if name.endswith('.tmp') or int(name[5:10]) >= self.parts:
+                os.remove(os.path.join(self.path, name))
+
+    def prepare(self, rows):
+        return [(position, row, None) for position, row in enumerate(rows)], 0
+
+    def write(self, source, first_row, pending, results):
+        self.buffer.extend(
+            _output_record(source, first_row, position, row, results, index)
+            for index, (position, row, _) in enumerate(pending)
+        )
+
+    def flush(self, save):
+        """
+        Write the buffered rows as the next part file, then save the checkpoint.
+        
+        Args:
+            save (callable): Records the output state in the checkpoint
+        """
+        if self.buffer:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            schema = pa.schema([
+                ('source', pa.string()), ('row', pa.int64()), ('feedback', pa.string()), ('department', pa.string()),
+                ('sentiment', pa.string()), ('score', pa.float64()), ('confidence', pa.float64()), ('error', pa.string())
+            ])
+            # Written under a temporary name and renamed, so a part is either complete or absent
+            temporary_path = self._part_path(self.parts) + '.tmp'
+            pq.write_table(pa.Table.from_pylist(self.buffer, schema=schema), temporary_path)
+            os.replace(temporary_path, self._part_path(self.parts))
+            self.parts += 1
+            self.buffer = []
+        save({'parts': self.parts})
+
+    def close(self):
+        pass
+
+def score_files(files, analyzer, sink, checkpoint, chunk_size=1000, checkpoint_rows=10000, progress_callback=None):
+    """
+    Score feedback files into a sink, resuming from a checkpoint.
+    
+    Files are read in chunks of chunk_size rows and each chunk is analyzed
+    in one bulk call. Results are flushed and the checkpoint saved every
+    checkpoint_rows rows and at the end of every file.
+    
+    Args:
+        files (list): Absolute paths of the input files
+        analyzer: SentimentAnalyzer or ProcessPoolAnalyzer
+        sink: DatabaseSink, CsvSink or ParquetSink
+        checkpoint (Checkpoint): Progress of earlier runs, saved by the sink as files are scored
+        chunk_size (int): Rows read and analyzed at a time
+        checkpoint_rows (int): Rows between checkpoints
+        progress_callback (callable): Called after every chunk with
+            (rows_done, rows_skipped, rows_failed) for this run
+    
+    Returns:
+        dict: Files and rows scored, skipped and failed, and timing
+    """
+    start_time = time.perf_counter()
+    totals = {'files': 0, 'rows': 0, 'skipped': 0, 'failed': 0}
+    sink.resume(checkpoint.data['output'])
+    
+    try:
+        for path in files:
+            state = checkpoint.file_state(path)
+            if state['done']:
+                continue
+            
+            rows_done = state['rows_done']
+            to_skip = rows_done
+            unflushed = 0
+            for rows in iter_feedback_batches(path, batch_size=chunk_size):
+                # Rows before the checkpoint were written by an earlier run
+                if to_skip >= len(rows):
+                    to_skip -= len(rows)
+                    continue
+                first_row = rows_done + 1
+                rows, to_skip = rows[to_skip:], 0
+                
+                pending, skipped = sink.prepare(rows)
+                results = analyzer.analyze_bulk_columnar([row['feedback'] for _, row, _ in pending])
+                sink.write(path, first_row, pending, results)
+                
+                rows_done += len(rows)
+                unflushed += len(rows)
+                totals['rows'] += len(rows)
+                totals['skipped'] += skipped
+                totals['failed'] += len(results.errors)
+                if unflushed >= checkpoint_rows:
+                    sink.flush(lambda output_state: checkpoint.update(path, rows_done, False, output_state))
+                    unflushed = 0
+                if progress_callback is not None:
+                    progress_callback(totals['rows'], totals['skipped'], totals['failed'])
+            
+            sink.flush(lambda output_state: checkpoint.update(path, rows_done, True, output_state))
+            totals['files'] += 1
+    finally:
+        sink.close()
+    
+    elapsed = time.perf_counter() - start_time
+    totals['seconds'] = round(elapsed, 2)
+    totals['rows_per_second'] = round(totals['rows'] / elapsed, 1) if elapsed > 0 else 0.0
+    return totals
+
+def count_pending_rows(files, checkpoint):
+    """
+    Count the rows a run still has to score, for progress and ETA.
+    
+    Args:
+        files (list): Absolute paths of the input files
+        checkpoint (Checkpoint): Progress of earlier runs
+    
+    Returns:
+        int: Rows not yet recorded in the checkpoint
+    """
+    total = 0
+    for path in files:
+        state = checkpoint.file_state(path)
+        if not state['done']:
+            total += max(count_rows(path) - state['rows_done'], 0)
+    return total
\ No newline at end of file
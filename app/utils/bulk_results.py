@@ -0,0 +1,148 @@
+import numpy as np
+
+class BulkResults:
+    def __init__(self, texts, scores, confidences, codes, errors, categories):
+        """
+        Columnar sentiment results for a batch of texts.
+        
+        Scores and confidences are float32 arrays and categories are int8
+        codes, so a result costs a few bytes instead of a dict per row.
+        Texts are referenced, not copied, and per-row dictionaries are
+        only built on request.
+        
+        Args:
+            texts (list): The analyzed texts, indexed like the columns
+            scores (ndarray): Sentiment scores between -1 and 1
+            confidences (ndarray): Model confidence of each prediction
+            codes (ndarray): Index into categories of each row's category
+            errors (dict): Row index mapped to the reason it could not be analyzed
+            categories (tuple): Category dictionaries (name, emoji, description) by code
+        """
+        self.texts = texts
+        self.scores = scores
+        self.confidences = confidences
+        self.codes = codes
+        self.errors = errors
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.codes)
+
+    def succeeded(self):
+        """
+        Get a mask of the rows that were analyzed successfully.
+        
+        Returns:
+            ndarray: Boolean array, False for rows listed in errors
+        """
+        mask = np.ones(len(self), dtype=bool)
+        mask[list(self.errors)] = False
+        return mask
+
+    def row(self, index):
+        """
+        Get one result in the format returned by SentimentAnalyzer.analyze_sentiment.
+        
+        Args:
+            index (int): Row index
+        
+        Returns:
+            dict: Text, score, category, emoji, description and confidence
+                (plus 'error' for rows that failed)
+        """
+        category = self.categories[self.codes[index]]
+        result = {
+            'text': self.texts[index] if self.texts is not None else None,
+            'score': round(float(self.scores[index]), 3),
+            'category': category['name'],
+            'emoji': category['emoji'],
+            'description': category['description'],
+            'confidence': round(float(self.confidences[index]), 3)
+        }
+        if index in self.errors:
+            result['error'] = self.errors[index]
+        return result
+
+    def to_dicts(self, start=0, stop=None):
+        """
+        Get a range of results as dictionaries.
+        
+        Args:
+            start (int): First row index
+            stop (int): Row index to stop before, defaults to the end
+        
+        Returns:
+            list: Results in the format of analyze_sentiment
+        """
+        return [self.row(index) for index in range(start, len(self) if stop is None else min(stop, len(self)))]
+
+    @classmethod
+    def concatenate(cls, parts, texts=None):
+        """
+        Join results of consecutive slices of a batch.
+        
+        Args:
+            parts (list): BulkResults in order
+            texts (list): Texts of the whole batch, if the parts don't carry them
+        
+        Returns:
+            BulkResults: Results for all rows
+        """
+        errors = {}
+        offset = 0
+        for part in parts:
+            errors.update({offset + index: error for index, error in part.errors.items()})
+            offset += len(part)
+        return cls(
+            texts if texts is not None else [text for part in parts for text in part.texts],
+            np.concatenate([part.scores for part in parts]) if parts else np.zeros(0, dtype=np.float32),
+            np.concatenate([part.confidences for part in parts]) if parts else np.zeros(0, dtype=np.float32),
+            np.concatenate([part.codes for part in parts]) if parts else np.zeros(0, dtype=np.int8),
+            errors,
+            parts[0].categories if parts else ()
+        )
+
+class ResultSummary:
+    def __init__(self):
+        """
+        Running totals over BulkResults, for reporting without keeping the rows.
+        """
+        self.categories = None
+        self.counts = None
+        self.rows = 0
+        self.score_sum = 0.0
+        self.confidence_sum = 0.0
+
+    def add(self, results):
+        """
+        Add the successfully analyzed rows of a batch.
+        
+        Args:
+            results (BulkResults): Results of the batch
+        """
+        if not len(results):
+            return
+        if self.categories is None:
+            self.categories = results.categories
+            self.counts = np.zeros(len(results.categories), dtype=np.int64)
+        
+        ok = results.succeeded()
+        self.counts += np.bincount(results.codes[ok], minlength=len(self.categories))
+        self.rows += int(ok.sum())
+        self.score_sum += float(results.scores[ok].sum(dtype=np.float64))
+        self.confidence_sum += float(results.confidences[ok].sum(dtype=np.float64))
+
+    def to_dict(self):
+        """
+        Get the totals.
+        
+        Returns:
+            dict: Row count, count per category, average score and confidence
+        """
+        counts = self.counts if self.counts is not None else ()
+        return {
+            'rows': self.rows,
+            'categories': {category['name']: int(count) for category, count in zip(self.categories or (), counts)},
+            'average_score': round(self.score_sum / self.rows, 3) if self.rows else None,
+            'average_confidence': round(self.confidence_sum / self.rows, 3) if self.rows else None
+        }
\ No newline at end of file
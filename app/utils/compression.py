@@ -0,0 +1,168 @@
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional; responses fall back to gzip without it
+    brotli = None
+
+# Mimetypes worth compressing; images, video and Parquet are already compressed
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/csv',
+    'text/javascript',
+    'text/plain'
+}
+
+def _accepted_encodings(header):
+    """Get the content codings an Accept-Encoding header allows (q=0 excluded)."""
+    accepted = set()
+    for part in header.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip() and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+class ResponseCompressor:
+    def __init__(self, min_size=1024, level=6, brotli_quality=4):
+        """
+        Compress JSON, NDJSON and text responses with brotli or gzip.
+        
+        Brotli is used when the client accepts it and the brotli package is
+        installed, gzip otherwise. Buffered bodies smaller than min_size are
+        sent as they are, since compression would barely shrink them. Streamed
+        bodies have no known size and are always compressed, one chunk at a
+        time, with a flush after every chunk so the client receives each one
+        as soon as it is produced.
+        
+        Args:
+            min_size (int): Smallest buffered body, in bytes, that is compressed
+            level (int): gzip level, 1 (fastest) to 9 (smallest)
+            brotli_quality (int): brotli quality, 0 (fastest) to 11 (smallest)
+        """
+        self.enabled = True
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+
+    def init_app(self, app):
+        """
+        Apply the application's compression settings and compress every eligible response.
+        
+        Args:
+            app (Flask): The Flask application
+        """
+        self.enabled = app.config['COMPRESSION_ENABLED']
+        self.min_size = app.config['COMPRESSION_MIN_SIZE']
+        self.level = app.config['COMPRESSION_LEVEL']
+        self.brotli_quality = app.config['COMPRESSION_BROTLI_QUALITY']
+        if not self.enabled:
+            return
+        
+        app.after_request(self.compress)
+
+    def choose_encoding(self, accept_encoding):
+        """
+        Pick the content coding for a request.
+        
+        Args:
+            accept_encoding (str): The request's Accept-Encoding header
+        
+        Returns:
+            str: 'br', 'gzip' or None
+        """
+        accepted = _accepted_encodings(accept_encoding or '')
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def compress(self, response):
+        """
+        Compress a response in place if the client and the content allow it.
+        
+        Args:
+            response (Response): The response about to be sent
+        
+        Returns:
+            Response: The same response
+        """
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or 'Content-Encoding' in response.headers
+                or response.direct_passthrough):
+            return response
+        
+        # Whether or not this one is compressed, caches must key on the header
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+        
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            response.set_data(self._compress_body(body, encoding))
+        
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compress_body(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.level, mtime=0)
+
+    def _compress_stream(self, chunks, encoding):
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            compress_chunk = lambda data: compressor.process(data) + compressor.flush()
+            finish = compressor.finish
+        else:
+            # wbits 16 + MAX_WBITS writes the gzip header and trailer around the deflate stream
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            compress_chunk = lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            finish = compressor.flush
+        
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                if chunk:
+                    yield compress_chunk(chunk)
+            yield finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    def stats(self):
+        """
+        Get the compression settings in effect.
+        
+        Returns:
+            dict: Whether compression is on, the encodings offered and the size threshold
+        """
+        return {
+            'enabled': self.enabled,
+            'encodings': ['br', 'gzip'] if brotli is not None else ['gzip'],
+            'min_size': self.min_size
+        }
+
+compressor = ResponseCompressor()
\ No newline at end of file
@@ -0,0 +1,166 @@
+import time
+from datetime import datetime
+from sqlalchemy import select
+from app import db
+from app.models.feedback import Feedback
+from app.models.rollup import apply_rollups
+from app.utils.metrics import metrics
+
+class FeedbackWriter:
+    def __init__(self, batch_size=1000, skip_duplicates=False):
+        """
+        Persist analyzed feedback with Core-level bulk inserts.
+        
+        Rows are written with a single executemany per batch, bypassing the
+        per-object overhead of the ORM, and each batch is its own transaction
+        together with the matching rollup updates.
+        
+        Args:
+            batch_size (int): Number of rows inserted per transaction
+            skip_duplicates (bool): Drop rows whose content hash is already
+                stored instead of inserting them again without the hash
+        """
+        self.batch_size = batch_size
+        self.skip_duplicates = skip_duplicates
+        self.rows_written = 0
+        self.rows_skipped = 0
+        self.seconds = 0.0
+
+    @staticmethod
+    def build_row(text, department, result, content_hash=None):
+        """
+        Build an insertable feedback row from a sentiment analysis result.
+        
+        Args:
+            text (str): The feedback text
+            department (str): The department the feedback belongs to
+            result (dict): Result from SentimentAnalyzer
+            content_hash (str): Identity of the feedback for deduplication, if any
+            
+        Returns:
+            dict: Column values for the feedback table
+        """
+        return {
+            'text': text,
+            'department': department,
+            'sentiment': result['category'],
+            'score': result['score'],
+            'confidence': result['confidence'],
+            'timestamp': datetime.utcnow(),
+            'content_hash': content_hash
+        }
+
+    def write(self, rows, before_commit=None):
+        """
+        Insert rows in batches, committing after each batch.
+        
+        Args:
+            rows (list): Column value dictionaries from build_row
+            before_commit (callable): Optional function called inside the
+                transaction of the last batch (or a transaction of its own
+                when there are no rows), right before it is committed
+            
+        Returns:
+            int: Number of rows written
+        """
+        start_time = time.perf_counter()
+        written = 0
+        
+        batches = [rows[offset:offset + self.batch_size] for offset in range(0, len(rows), self.batch_size)]
+        if not batches and before_commit is not None:
+            batches = [[]]
+        for number, batch in enumerate(batches, start=1):
+            try:
+                with metrics.timed('db_commit', items=len(batch)):
+                    inserted = self._insert(batch) if self.skip_duplicates else self._insert_all(batch)
+                    # Only stored rows count towards the statistics
+                    apply_rollups(inserted)
+                    if before_commit is not None and number == len(batches):
+                        before_commit()
+                    db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            written += len(inserted)
+        
+        self.seconds += time.perf_counter() - start_time
+        self.rows_written += written
+        self.rows_skipped += len(rows) - written
+        return written
+
+    def _insert_all(self, batch):
+        # A hash can only be stored once, so copies of stored rows go in without it
+        inserted = self._insert(batch)
+        if len(inserted) < len(batch):
+            stored = {id(row) for row in inserted}
+            copies = [dict(row, content_hash=None) for row in batch if id(row) not in stored]
+            db.session.execute(Feedback.__table__.insert(), copies)
+            inserted = inserted + copies
+        return inserted
+
+    def _insert(self, batch):
+        """
+        Insert the rows of a batch whose content hash is not stored yet.
+        
+        Uses INSERT ... ON CONFLICT DO NOTHING ... RETURNING where the
+        driver supports RETURNING for executemany (SQLAlchemy 2.0 with
+        PostgreSQL or SQLite 3.35+), so rows written concurrently by another
+        upload are skipped rather than failing the batch. Elsewhere the
+        stored hashes are looked up first and only the new rows inserted.
+        
+        Args:
+            batch (list): Column value dictionaries from build_row
+            
+        Returns:
+            list: The rows that were inserted
+        """
+        table = Feedback.__table__
+        unhashed = [row for row in batch if row.get('content_hash') is None]
+        unique = {}
+        for row in batch:
+            if row.get('content_hash') is not None:
+                unique.setdefault(row['content_hash'], row)
+        
+        if unhashed:
+            db.session.execute(table.insert(), unhashed)
+        if not unique:
+            return unhashed
+        
+        dialect = db.session.get_bind().dialect
+        if not getattr(dialect, 'insert_executemany_returning', False):
+            insert = None
+        elif dialect.name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            insert = None
+        
+        if insert is not None:
+            stmt = insert(table).on_conflict_do_nothing(index_elements=['content_hash']).returning(table.c.content_hash)
+            stored = set(db.session.execute(stmt, list(unique.values())).scalars())
+        else:
+            existing = set(db.session.execute(
+                select(table.c.content_hash).where(table.c.content_hash.in_(list(unique)))
+            ).scalars())
+            new_rows = [row for digest, row in unique.items() if digest not in existing]
+            if new_rows:
+                db.session.execute(table.insert(), new_rows)
+            stored = {row['content_hash'] for row in new_rows}
+        
+        return unhashed + [row for digest, row in unique.items() if digest in stored]
+
+    def stats(self):
+        """
+        Get throughput of the write stage.
+        
+        Returns:
+            dict: Rows written, time spent and rows per second
+        """
+        return {
+            'batch_size': self.batch_size,
+            'rows_written': self.rows_written,
+            'rows_skipped': self.rows_skipped,
+            'write_seconds': round(self.seconds, 3),
+            'write_rows_per_second': round(self.rows_written / self.seconds, 1) if self.seconds > 0 else 0.0
+        }
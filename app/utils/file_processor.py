@@ -1,53 +1,40 @@
-import pandas as pd
-from app.utils.sentiment_analyzer import SentimentAnalyzer
+from app.utils.bulk_results import ResultSummary
+from app.utils.feedback_writer import FeedbackWriter
+from app.utils.registry import get_sentiment_analyzer, get_bulk_analyzer
+from app.utils.readers import iter_feedback_batches
+from app.models.feedback import Feedback, content_hash
 from app import db
-from app.models.feedback import Feedback
-from datetime import datetime
-
-# Initialize the sentiment analyzer
-sentiment_analyzer = SentimentAnalyzer()
+from config import Config
+import time
 
 def process_excel(file):
     """
     Process Excel/CSV file containing feedback data.
     Expected columns: 'feedback', 'department' (optional)
     """
+    sentiment_analyzer = get_bulk_analyzer()
+    writer = FeedbackWriter(batch_size=Config.DB_WRITE_BATCH_SIZE)
+    
     try:
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
-            df = pd.read_excel(file)
-
-        # Validate required columns
-        if 'feedback' not in df.columns:
-            raise ValueError("File must contain a 'feedback' column")
-
-        # Process feedback texts
-        texts = df['feedback'].tolist()
-        departments = df['department'].tolist() if 'department' in df.columns else [None] * len(texts)
-
-        # Analyze sentiments using Hugging Face
-        results = sentiment_analyzer.analyze_bulk(texts)
-
-        # Save to database
-        for result, department in zip(results, departments):
-            feedback = Feedback(
-                text=result['text'],
-                sentiment=result['category'],
-                score=result['score'],
-                confidence=result['confidence'],
-                department=department,
-                timestamp=datetime.utcnow()
-            )
-            db.session.add(feedback)
+        results = []
+        # The file is read in batches by the unified reader (XLSX, CSV, JSON Lines or Parquet)
+        for rows in iter_feedback_batches(file, batch_size=Config.UPLOAD_CHUNK_SIZE):
+            # Analyze sentiments using Hugging Face
+            batch_results = sentiment_analyzer.analyze_bulk([row['feedback'] for row in rows])
+            
+            # Save to database
+            writer.write([
+                FeedbackWriter.build_row(result['text'], row['department'], result)
+                for result, row in zip(batch_results, rows)
+                if 'error' not in result
+            ])
+            results.extend(batch_results)
         
-        db.session.commit()
-
         return {
             'message': f'Successfully processed {len(results)} feedback entries',
             'results': results
         }
-
+    
     except Exception as e:
         raise Exception(f"Error processing file: {str(e)}")
 
@@ -57,27 +44,36 @@ def process_google_form(form_data):
     Expected format: {'feedback': text, 'department': department}
     """
     try:
-        result = sentiment_analyzer.analyze_sentiment(form_data['feedback'])
+        result = get_sentiment_analyzer().analyze_sentiment(form_data['feedback'])
+        
+        FeedbackWriter().write([
+            FeedbackWriter.build_row(result['text'], form_data.get('department'), result)
+        ])
         
-        feedback = Feedback(
-            text=result['text'],
-            sentiment=result['category'],
-            score=result['score'],
-            confidence=result['confidence'],
-            department=form_data.get('department'),
-            timestamp=datetime.utcnow()
-        )
-        db.session.add(feedback)
-        db.session.commit()
-
         return {
             'message': 'Successfully processed feedback',
             'result': result
         }
-
+    
     except Exception as e:
         raise Exception(f"Error processing Google Form data: {str(e)}")
 
+def iter_csv_chunks(file, chunk_size=1000):
+    """
+    Stream a CSV file of employee feedback in fixed-size chunks.
+    
+    Only the 'feedback' and 'department' columns are parsed, and at most
+    chunk_size rows are held in memory at a time.
+    
+    Args:
+        file: FileStorage object or path of the CSV file
+        chunk_size (int): Number of rows per chunk
+        
+    Returns:
+        generator: Lists of dictionaries containing feedback data
+    """
+    return iter_feedback_batches(file, 'csv', chunk_size)
+
 def process_csv(file):
     """
     Process a CSV file containing employee feedback.
@@ -88,23 +84,194 @@ def process_csv(file):
     Returns:
         list: List of dictionaries containing feedback data
     """
-    try:
-        # Read CSV file
-        df = pd.read_csv(file)
+    feedback_data = []
+    for chunk in iter_csv_chunks(file):
+        feedback_data.extend(chunk)
+    return feedback_data
+
+def find_stored_hashes(hashes, batch_size=500):
+    """
+    Find which content hashes are already stored in the feedback table.
+    
+    Args:
+        hashes (set): Content hashes to look up
+        batch_size (int): Hashes per query, kept below SQLite's variable limit
         
-        # Validate required columns
-        if 'feedback' not in df.columns:
-            raise ValueError("CSV file must contain a 'feedback' column")
-            
-        # Convert to list of dictionaries
-        feedback_data = []
-        for _, row in df.iterrows():
-            feedback_data.append({
-                'feedback': str(row['feedback']),
-                'department': str(row.get('department', ''))
-            })
-            
-        return feedback_data
+    Returns:
+        set: The hashes that are already stored
+    """
+    hashes = list(hashes)
+    stored = set()
+    for offset in range(0, len(hashes), batch_size):
+        stored.update(db.session.execute(
+            db.select(Feedback.content_hash).where(Feedback.content_hash.in_(hashes[offset:offset + batch_size]))
+        ).scalars())
+    return stored
+
+# How ingest_file reports per-row results: none, only totals, a page of rows, or every row;
+# 'stream' hands each chunk's rows to the caller of iter_ingest_file as soon as it is stored
+RESULT_MODES = ('none', 'summary', 'page', 'full', 'stream')
+
+def ingest_file(file, **kwargs):
+    """
+    Analyze and store a feedback file (CSV, XLSX, JSON Lines or Parquet) chunk by chunk.
+    
+    Args:
+        file: FileStorage object or path of the file
+        **kwargs: Options of iter_ingest_file
         
-    except Exception as e:
-        raise Exception(f"Error processing CSV file: {str(e)}") 
\ No newline at end of file
+    Returns:
+        dict: The summary produced by iter_ingest_file
+    """
+    for kind, payload in iter_ingest_file(file, **kwargs):
+        if kind == 'summary':
+            return payload
+
+def iter_ingest_file(file, chunk_size=1000, results_mode='summary', progress_callback=None, max_errors=100,
+                     write_batch_size=1000, dedupe=False, results_offset=0, results_limit=100, file_format=None):
+    """
+    Analyze and store a feedback file chunk by chunk, yielding as it goes.
+    
+    Each chunk is analyzed in batches and bulk inserted before the next one
+    is read, so memory use does not grow with the size of the file.
+    
+    Every row is identified by the hash of its normalized text and
+    department, which is stored with the first copy of the row. With dedupe,
+    rows already stored (by an earlier upload, or earlier in this file) are
+    skipped before they reach the analyzer, so uploading the same or an
+    overlapping file again costs no inference and does not inflate the
+    statistics. Without it, further copies are stored without a hash.
+    
+    In 'stream' mode the results and errors of each chunk are yielded once
+    the chunk is committed and then dropped, so a caller writing them out
+    (such as the NDJSON response of /upload) holds one chunk at a time.
+    
+    Args:
+        file: FileStorage object or path of the file
+        chunk_size (int): Number of rows read and analyzed at a time
+        results_mode (str): One of RESULT_MODES; 'page' keeps only the analyzed
+            rows from results_offset to results_offset + results_limit
+        progress_callback (callable): Optional function called after each chunk
+            is stored with (rows_done, rows_failed, errors_in_chunk, rows_skipped),
+            inside a transaction that is committed right after it returns
+        max_errors (int): Maximum number of row errors kept in the summary
+        write_batch_size (int): Number of rows inserted per transaction
+        dedupe (bool): Whether to skip rows that are already stored
+        results_offset (int): First analyzed row returned in 'page' mode
+        results_limit (int): Number of rows returned in 'page' mode
+        file_format (str): Format of the file, detected from its name if omitted
+        
+    Yields:
+        tuple: ('rows', list) for every chunk in 'stream' mode, holding the
+            chunk's results and {'row', 'error'} entries in file order; then
+            ('summary', dict) with row counts, row errors, timing, totals per
+            category and (depending on results_mode) the results of the rows
+            that were analyzed
+    """
+    sentiment_analyzer = get_bulk_analyzer()
+    writer = FeedbackWriter(batch_size=write_batch_size, skip_duplicates=dedupe)
+    processed = 0
+    inferred = 0
+    analyzed = 0
+    skipped = 0
+    failed = 0
+    analysis_seconds = 0.0
+    dedupe_seconds = 0.0
+    errors = []
+    summary = ResultSummary()
+    results = [] if results_mode in ('page', 'full') else None
+    results_stop = results_offset + results_limit if results_mode == 'page' else None
+    
+    for rows in iter_feedback_batches(file, file_format, chunk_size):
+        # (position in chunk, row, content hash) of the rows that need analysis. The first
+        # copy of each row keeps its hash even without dedupe, so a later deduplicated
+        # upload recognizes it; further copies are skipped, or stored without a hash
+        dedupe_start = time.perf_counter()
+        hashes = [
+            content_hash(row['feedback'], row['department']) if row['feedback'].strip() else None
+            for row in rows
+        ]
+        seen = find_stored_hashes({digest for digest in hashes if digest is not None})
+        pending = []
+        for position, (row, digest) in enumerate(zip(rows, hashes)):
+            if digest is not None:
+                if digest not in seen:
+                    seen.add(digest)
+                elif dedupe:
+                    skipped += 1
+                    continue
+                else:
+                    digest = None
+            pending.append((position, row, digest))
+        dedupe_seconds += time.perf_counter() - dedupe_start
+        
+        analysis_start = time.perf_counter()
+        chunk_results = sentiment_analyzer.analyze_bulk_columnar([row['feedback'] for _, row, _ in pending])
+        analysis_seconds += time.perf_counter() - analysis_start
+        
+        chunk_errors = []
+        feedback_rows = []
+        for index, (position, row, digest) in enumerate(pending):
+            if index in chunk_results.errors:
+                failed += 1
+                chunk_errors.append({'row': processed + position + 1, 'error': chunk_results.errors[index]})
+                continue
+            feedback_rows.append(FeedbackWriter.build_row(
+                row['feedback'],
+                row['department'],
+                chunk_results.row(index),
+                digest
+            ))
+        writer.write(feedback_rows)
+        summary.add(chunk_results)
+        
+        # Keep only the requested rows; row numbers identify them in the file
+        if results is not None:
+            start = max(results_offset - inferred, 0) if results_stop is not None else 0
+            stop = results_stop - inferred if results_stop is not None else len(pending)
+            for index in range(start, min(stop, len(pending))):
+                results.append(dict(chunk_results.row(index), row=processed + pending[index][0] + 1))
+        if results_mode == 'stream':
+            chunk_rows = [
+                dict(chunk_results.row(index), row=processed + position + 1)
+                for index, (position, _, _) in enumerate(pending)
+                if index not in chunk_results.errors
+            ]
+            chunk_rows.extend(chunk_errors)
+            chunk_rows.sort(key=lambda entry: entry['row'])
+        inferred += len(pending)
+        # Rows the analyzer failed on are counted as failed, not analyzed
+        analyzed += len(pending) - len(chunk_results.errors)
+        
+        processed += len(rows)
+        if progress_callback is not None:
+            progress_callback(processed, failed, chunk_errors, skipped + writer.rows_skipped)
+        db.session.commit()
+        
+        errors.extend(chunk_errors[:max(max_errors - len(errors), 0)])
+        if results_mode == 'stream':
+            yield 'rows', chunk_rows
+    
+    yield 'summary', {
+        'processed': processed,
+        'analyzed': analyzed,
+        # Rows stored concurrently by another upload are caught at insert time
+        'skipped': skipped + writer.rows_skipped,
+        'saved': writer.rows_written,
+        'failed': failed,
+        'errors': errors,
+        'summary': summary.to_dict(),
+        'results': results,
+        'performance': {
+            'chunk_size': chunk_size,
+            'batch_size': sentiment_analyzer.batch_size,
+            'dedupe_seconds': round(dedupe_seconds, 3),
+            'analysis_seconds': round(analysis_seconds, 3),
+            'texts_per_second': round(analyzed / analysis_seconds, 1) if analysis_seconds > 0 else 0.0,
+            'write_batch_size': write_batch_size,
+            'rows_written': writer.rows_written,
+            'write_seconds': round(writer.seconds, 3),
+            'write_rows_per_second': writer.stats()['write_rows_per_second']
+        },
+        'cache': sentiment_analyzer.cache.stats() if sentiment_analyzer.cache is not None else None
+    }
\ No newline at end of file
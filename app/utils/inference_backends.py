@@ -0,0 +1,66 @@
+import os
+
+# Backends SentimentAnalyzer can run the model on
+INFERENCE_BACKENDS = ('pytorch', 'quantized', 'onnx')
+
+def build_pipeline(model_name, backend='pytorch', num_threads=None, onnx_dir=None):
+    """
+    Build a Hugging Face sentiment-analysis pipeline on the requested backend.
+    
+    - pytorch: the fp32 model, on GPU when one is available
+    - quantized: the PyTorch model with Linear layers dynamically quantized to int8 (CPU)
+    - onnx: the model exported to ONNX and run with ONNX Runtime (CPU);
+      requires optimum[onnxruntime]
+    
+    Args:
+        model_name (str): Hugging Face model id
+        backend (str): One of INFERENCE_BACKENDS
+        num_threads (int): Intra-op thread count, None to keep the library default
+        onnx_dir (str): Where the ONNX export is cached between runs
+        
+    Returns:
+        Pipeline: Callable sentiment-analysis pipeline
+    """
+    from transformers import pipeline, AutoTokenizer
+    import torch
+    
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {', '.join(INFERENCE_BACKENDS)}")
+    
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    
+    if backend == 'pytorch':
+        return pipeline(
+            "sentiment-analysis",
+            model=model_name,
+            device=0 if torch.cuda.is_available() else -1
+        )
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    
+    if backend == 'quantized':
+        from transformers import AutoModelForSequenceClassification
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, device=-1)
+    
+    try:
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError:
+        raise ImportError("The onnx inference backend requires optimum[onnxruntime]: pip install 'optimum[onnxruntime]'")
+    
+    session_options = onnxruntime.SessionOptions()
+    if num_threads:
+        session_options.intra_op_num_threads = num_threads
+    
+    # Exporting takes a while, so reuse a previous export when there is one
+    if onnx_dir and os.path.exists(os.path.join(onnx_dir, 'model.onnx')):
+        model = ORTModelForSequenceClassification.from_pretrained(onnx_dir, session_options=session_options)
+    else:
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True, session_options=session_options)
+        if onnx_dir:
+            model.save_pretrained(onnx_dir)
+    
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
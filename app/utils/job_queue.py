@@ -0,0 +1,181 @@
+import json
+import os
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
+from app import db
+from app.models.job import UploadJob
+from app.utils.file_processor import ingest_file
+from app.utils.readers import count_rows
+
+class JobQueue:
+    def __init__(self, app=None):
+        """
+        Run bulk uploads on a local thread pool, tracking progress in the database.
+        
+        Args:
+            app: Optional Flask application to bind immediately
+        """
+        self.app = None
+        self.executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Bind the queue to an application and resume jobs left over from a restart.
+        
+        Args:
+            app: Flask application whose config and database the jobs use
+        """
+        self.app = app
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config['JOB_WORKERS'],
+            thread_name_prefix='upload-job'
+        )
+        self.upload_folder = os.path.join(app.instance_path, app.config['UPLOAD_FOLDER'])
+        os.makedirs(self.upload_folder, exist_ok=True)
+        
+        with app.app_context():
+            self._recover()
+
+    @property
+    def worker_id(self):
+        """Identify this process (read per call, so forked workers differ) in the jobs it runs."""
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def _recover(self):
+        """
+        Requeue jobs that never started and flag jobs cut off mid-run.
+        
+        Several processes may share the database, so a running job is only
+        considered cut off once its owner has reported no progress for
+        JOB_HEARTBEAT_TIMEOUT seconds. Queued jobs are offered to this
+        process's pool; _run lets only one process claim each of them.
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.app.config['JOB_HEARTBEAT_TIMEOUT'])
+        db.session.execute(
+            update(UploadJob)
+            .where(UploadJob.status == 'running', or_(UploadJob.heartbeat_at.is_(None), UploadJob.heartbeat_at < cutoff))
+            .values(status='interrupted', error_message='Job was interrupted by a server restart', finished_at=now)
+        )
+        
+        for job in UploadJob.query.filter(UploadJob.status == 'queued').all():
+            if os.path.exists(job.file_path):
+                self.executor.submit(self._run, job.id)
+            else:
+                db.session.execute(
+                    update(UploadJob)
+                    .where(UploadJob.id == job.id, UploadJob.status == 'queued')
+                    .values(status='interrupted', error_message='Uploaded file is missing', finished_at=now)
+                )
+        db.session.commit()
+
+    def _claim(self, job_id):
+        """
+        Mark a queued job as running by this process.
+        
+        The status check and the update are one statement, so when several
+        processes try to run the same job exactly one of them gets it.
+        
+        Args:
+            job_id (str): Identifier of the job to claim
+            
+        Returns:
+            bool: True if this process now owns the job
+        """
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(UploadJob)
+            .where(UploadJob.id == job_id, UploadJob.status == 'queued')
+            .values(status='running', started_at=now, heartbeat_at=now, worker=self.worker_id)
+        ).rowcount
+        db.session.commit()
+        return claimed == 1
+
+    def submit(self, file, dedupe=False):
+        """
+        Save an uploaded file and queue it for analysis.
+        
+        Args:
+            file: FileStorage object containing the feedback file (CSV, XLSX, JSON Lines or Parquet)
+            dedupe (bool): Whether to skip rows that are already stored
+            
+        Returns:
+            UploadJob: The newly queued job
+        """
+        job_id = uuid.uuid4().hex
+        # Keep the extension, it identifies the file format
+        file_path = os.path.join(self.upload_folder, f"{job_id}{os.path.splitext(file.filename)[1].lower()}")
+        file.save(file_path)
+        
+        job = UploadJob(id=job_id, filename=file.filename, file_path=file_path, dedupe=dedupe)
+        db.session.add(job)
+        db.session.commit()
+        
+        self.executor.submit(self._run, job_id)
+        return job
+
+    def _run(self, job_id):
+        """
+        Execute a queued job inside its own application context.
+        
+        Args:
+            job_id (str): Identifier of the job to run
+        """
+        with self.app.app_context():
+            if not self._claim(job_id):
+                return
+            job = db.session.get(UploadJob, job_id)
+            
+            try:
+                job.total_rows = count_rows(job.file_path)
+                job.heartbeat_at = datetime.utcnow()
+                db.session.commit()
+                
+                max_errors = self.app.config['JOB_MAX_ERRORS']
+                
+                def record_progress(rows_done, rows_failed, errors, rows_skipped):
+                    job.rows_done = rows_done
+                    job.rows_failed = rows_failed
+                    job.rows_skipped = rows_skipped
+                    job.rows_saved = rows_done - rows_failed - rows_skipped
+                    job.heartbeat_at = datetime.utcnow()
+                    if errors:
+                        stored = json.loads(job.errors)
+                        stored.extend(errors[:max(max_errors - len(stored), 0)])
+                        job.errors = json.dumps(stored)
+                
+                summary = ingest_file(
+                    job.file_path,
+                    chunk_size=self.app.config['UPLOAD_CHUNK_SIZE'],
+                    write_batch_size=self.app.config['DB_WRITE_BATCH_SIZE'],
+                    results_mode='none',
+                    progress_callback=record_progress,
+                    dedupe=job.dedupe
+                )
+                summary.pop('results', None)
+                summary.pop('errors', None)
+                
+                job.status = 'completed'
+                job.summary = json.dumps(summary)
+                
+            except Exception as e:
+                print(f"Error in upload job {job_id}: {str(e)}")
+                db.session.rollback()
+                job = db.session.get(UploadJob, job_id)
+                job.status = 'failed'
+                job.error_message = str(e)
+            
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            
+            try:
+                os.remove(job.file_path)
+            except OSError:
+                pass
+
+job_queue = JobQueue()
\ No newline at end of file
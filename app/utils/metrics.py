@@ -0,0 +1,301 @@
+import bisect
+import threading
+import time
+from flask import g, request
+from config import Config
+
+# Upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        """
+        Monotonic counter, optionally split by labels.
+        
+        Args:
+            name (str): Metric name
+            help_text (str): Description shown in the exposition
+            label_names (tuple): Names of the labels passed to inc()
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        """
+        Increase the counter.
+        
+        Args:
+            *label_values: One value per label name
+            amount (float): How much to add
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        """
+        Distribution of observed values with cumulative buckets.
+        
+        Args:
+            name (str): Metric name
+            help_text (str): Description shown in the exposition
+            label_names (tuple): Names of the labels passed to observe()
+            buckets (tuple): Sorted bucket upper bounds
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """
+        Record a value.
+        
+        Args:
+            value (float): The observed value, e.g. a duration in seconds
+            *label_values: One value per label name
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (plus +Inf), sum, count
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.label_names + ('le',), label_values + (bound,))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {total:.6f}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class Gauge:
+    def __init__(self, name, help_text, callback):
+        """
+        Value read from a callback when metrics are collected.
+        
+        Args:
+            name (str): Metric name
+            help_text (str): Description shown in the exposition
+            callback (callable): Returns the current value, or None to omit it
+        """
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+
+    def render(self):
+        try:
+            value = self.callback()
+        except Exception as e:
+            print(f"Error collecting metric {self.name}: {str(e)}")
+            value = None
+        if value is None:
+            return []
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+class _Timer:
+    __slots__ = ('histogram', 'label_values', 'start_time')
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.histogram.observe(time.perf_counter() - self.start_time, *self.label_values)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class Metrics:
+    def __init__(self, enabled=True):
+        """
+        In-process metrics registry exposed in the Prometheus text format.
+        
+        When disabled, timers are a shared no-op and counters are not
+        touched, so instrumented code pays only an attribute check.
+        
+        Args:
+            enabled (bool): Whether measurements are recorded
+        """
+        self.enabled = enabled
+        self._metrics = {}
+        
+        self.stage_seconds = self.histogram(
+            'sentiment_stage_duration_seconds',
+            'Time spent in each processing stage',
+            ('stage',)
+        )
+        self.stage_items = self.counter(
+            'sentiment_stage_items_total',
+            'Items processed by each stage (texts, rows or files)',
+            ('stage',)
+        )
+        self.request_seconds = self.histogram(
+            'http_request_duration_seconds',
+            'HTTP request latency by route',
+            ('method', 'route', 'status')
+        )
+        self.media_cache = self.counter(
+            'media_cache_requests_total',
+            'Avatar and video lookups by cache outcome',
+            ('kind', 'result')
+        )
+
+    def counter(self, name, help_text, label_names=()):
+        """Register and return a Counter."""
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        """Register and return a Histogram."""
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def gauge(self, name, help_text, callback):
+        """Register and return a Gauge read from callback at collection time."""
+        return self._register(Gauge(name, help_text, callback))
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def timed(self, stage, items=None):
+        """
+        Time the enclosed block as a processing stage.
+        
+        Args:
+            stage (str): Stage name, e.g. 'forward' or 'db_commit'
+            items (int): Number of items the block processes, if counted
+        
+        Returns:
+            context manager: Records the duration on exit
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        if items is not None:
+            self.stage_items.inc(stage, amount=items)
+        return _Timer(self.stage_seconds, (stage,))
+
+    def instrument(self, obj, method_name, stage):
+        """
+        Wrap a method of an object so every call is timed as a stage.
+        
+        Args:
+            obj: The object whose method is wrapped (the instance only, not its class)
+            method_name (str): Name of the method
+            stage (str): Stage name the calls are recorded under
+        """
+        method = getattr(obj, method_name, None)
+        if not self.enabled or method is None:
+            return
+        histogram = self.stage_seconds
+
+        def timed_method(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start_time, stage)
+        setattr(obj, method_name, timed_method)
+
+    def init_app(self, app):
+        """
+        Apply the application's METRICS_ENABLED setting and time every request.
+        
+        Args:
+            app (Flask): The Flask application
+        """
+        self.enabled = app.config['METRICS_ENABLED']
+        if not self.enabled:
+            return
+
+        @app.before_request
+        def start_request_timer():
+            g.metrics_start_time = time.perf_counter()
+
+        @app.after_request
+        def record_request_latency(response):
+            start_time = g.pop('metrics_start_time', None)
+            if start_time is not None:
+                # Label by route pattern rather than URL to keep the number of series bounded
+                route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+                self.request_seconds.observe(
+                    time.perf_counter() - start_time, request.method, route, response.status_code
+                )
+            return response
+
+    def render(self):
+        """
+        Format every metric in the Prometheus text exposition format.
+        
+        Returns:
+            str: The exposition body
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics(enabled=Config.METRICS_ENABLED)
+
+def _cache_stat(field):
+    """Read a result cache statistic without loading the model."""
+    from app.utils import registry
+    if not registry.is_loaded('sentiment_analyzer'):
+        return None
+    cache = registry.get_sentiment_analyzer().cache
+    return cache.stats()[field] if cache is not None else None
+
+def _queue_depth():
+    """Read the micro-batcher queue depth without creating it."""
+    from app.utils import registry
+    if not registry.is_loaded('micro_batcher'):
+        return None
+    return registry.get_micro_batcher().stats()['queue_depth']
+
+metrics.gauge('sentiment_cache_hits', 'Sentiment result cache hits since startup', lambda: _cache_stat('hits'))
+metrics.gauge('sentiment_cache_misses', 'Sentiment result cache misses since startup', lambda: _cache_stat('misses'))
+metrics.gauge('sentiment_cache_hit_ratio', 'Share of sentiment lookups answered from the cache', lambda: _cache_stat('hit_ratio'))
+metrics.gauge('micro_batch_queue_depth', 'Texts waiting for a micro-batch', _queue_depth)
\ No newline at end of file
@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class _PendingText:
+    __slots__ = ('text', 'future', 'enqueued_at')
+
+    def __init__(self, text):
+        self.text = text
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+class MicroBatcher:
+    def __init__(self, analyzer, max_batch_size=16, max_wait_ms=5):
+        """
+        Coalesce concurrent single-text requests into batched forward passes.
+        
+        Callers enqueue texts and wait on a future. A single worker thread
+        takes the oldest text, keeps collecting until the batch is full or
+        the oldest text has waited max_wait_ms, runs one analyze_bulk call
+        and hands each caller its own result.
+        
+        Args:
+            analyzer (SentimentAnalyzer): Analyzer used for the batches
+            max_batch_size (int): Maximum number of texts per batch
+            max_wait_ms (float): Longest a text waits for others to join its batch
+        """
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._batch_sizes = {}
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, text):
+        """
+        Queue a text for analysis.
+        
+        Args:
+            text (str): The text to analyze
+            
+        Returns:
+            Future: Resolves to the same result dict as analyze_sentiment
+        """
+        pending = _PendingText(text)
+        self._queue.put(pending)
+        return pending.future
+
+    def analyze_sentiment(self, text, timeout=None):
+        """
+        Analyze a text as part of the next batch and wait for its result.
+        
+        Args:
+            text (str): The text to analyze
+            timeout (float): Seconds to wait for the result, None waits forever
+            
+        Returns:
+            dict: Dictionary containing sentiment analysis results
+        """
+        return self.submit(text).result(timeout=timeout)
+
+    def _collect_batch(self):
+        """Block for the next text, then gather more until the batch is full or its deadline passes."""
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started_at = time.perf_counter()
+            self._record_batch(batch, started_at)
+            
+            try:
+                results = self.analyzer.analyze_bulk([pending.text for pending in batch], record_stats=False)
+            except Exception as e:
+                print(f"Error in micro-batched sentiment analysis: {str(e)}")
+                for pending in batch:
+                    pending.future.set_exception(e)
+                continue
+            
+            for pending, result in zip(batch, results):
+                pending.future.set_result(result)
+
+    def _record_batch(self, batch, started_at):
+        """Update the batch-size histogram and queue wait statistics."""
+        waits = [started_at - pending.enqueued_at for pending in batch]
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+            self._wait_seconds_total += sum(waits)
+            self._wait_seconds_max = max(self._wait_seconds_max, max(waits))
+
+    def stats(self):
+        """
+        Get queueing and batching statistics for tuning.
+        
+        Returns:
+            dict: Queue depth, batch counts, batch-size histogram and wait times
+        """
+        with self._stats_lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'queue_depth': self._queue.qsize(),
+                'batches': self._batches,
+                'texts': self._items,
+                'average_batch_size': round(self._items / self._batches, 2) if self._batches else 0.0,
+                'batch_size_histogram': dict(sorted(self._batch_sizes.items())),
+                'average_wait_ms': round(self._wait_seconds_total / self._items * 1000, 3) if self._items else 0.0,
+                'max_wait_ms_observed': round(self._wait_seconds_max * 1000, 3)
+            }
@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from app.utils.bulk_results import BulkResults
+
+# Analyzer owned by each worker process, created once by _init_worker
+_worker_analyzer = None
+
+def _init_worker(analyzer_kwargs, cache_size, cache_path, threads):
+    """
+    Load the model once in a freshly spawned worker process.
+    
+    Thread counts are pinned before torch is imported so that the workers
+    together use about one thread per core instead of each claiming all of them.
+    """
+    global _worker_analyzer
+    for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[name] = str(threads)
+    
+    import torch
+    torch.set_num_threads(threads)
+    
+    from app.utils.sentiment_analyzer import SentimentAnalyzer
+    from app.utils.result_cache import ResultCache
+    _worker_analyzer = SentimentAnalyzer(
+        num_threads=threads,
+        cache=ResultCache(max_size=cache_size, path=cache_path) if cache_size else None,
+        **analyzer_kwargs
+    )
+
+def _analyze_chunk(texts):
+    """Analyze a chunk of texts in a worker process, returning columns without the texts."""
+    results = _worker_analyzer.analyze_bulk_columnar(texts)
+    # The parent already has the texts; don't send them back
+    results.texts = None
+    return results
+
+def _warm_up_worker(delay):
+    """Run one inference and hold the worker briefly so the other workers pick up their own task."""
+    _worker_analyzer.analyze_bulk(["Warm-up"])
+    time.sleep(delay)
+    return os.getpid()
+
+class ProcessPoolAnalyzer:
+    def __init__(self, workers, chunk_size=256, threads_per_worker=None, cache_size=0, cache_path=None,
+                 **analyzer_kwargs):
+        """
+        Run bulk sentiment analysis across several worker processes.
+        
+        Each worker loads its own SentimentAnalyzer once and receives chunks
+        of texts; results are returned in input order. Exposes the same
+        analyze_bulk and analyze_bulk_columnar interface as SentimentAnalyzer.
+        
+        Args:
+            workers (int): Number of worker processes
+            chunk_size (int): Texts sent to a worker at a time
+            threads_per_worker (int): Torch threads per worker, defaults to
+                the number of cores divided by the number of workers
+            cache_size (int): Size of each worker's in-memory result cache, 0 disables it
+            cache_path (str): Optional SQLite file shared by the workers' caches
+            **analyzer_kwargs: Passed to SentimentAnalyzer in every worker
+        """
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self.batch_size = analyzer_kwargs.get('batch_size', 32)
+        self.cache = None  # Each worker keeps its own cache
+        self.last_bulk_stats = {}
+        
+        # Spawned (not forked) workers don't inherit torch's thread pools from the parent
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(analyzer_kwargs, cache_size, cache_path, self.threads_per_worker)
+        )
+
+    def warm_up(self, delay=0.5):
+        """
+        Start every worker and load its model ahead of the first bulk job.
+        
+        Args:
+            delay (float): Seconds each warm-up task holds its worker
+            
+        Returns:
+            int: Number of distinct workers that answered
+        """
+        futures = [self.executor.submit(_warm_up_worker, delay) for _ in range(self.workers)]
+        return len({future.result() for future in futures})
+
+    def analyze_bulk(self, texts, batch_size=None):
+        """
+        Analyze sentiment for multiple texts across the worker processes.
+        
+        Args:
+            texts (list): List of text strings to analyze
+            batch_size (int): Ignored; each worker uses its configured batch size
+            
+        Returns:
+            list: List of sentiment analysis results, in input order
+        """
+        return self.analyze_bulk_columnar(texts, batch_size).to_dicts()
+
+    def analyze_bulk_columnar(self, texts, batch_size=None):
+        """
+        Analyze sentiment for multiple texts across the worker processes.
+        
+        Args:
+            texts (list): List of text strings to analyze
+            batch_size (int): Ignored; each worker uses its configured batch size
+            
+        Returns:
+            BulkResults: Columnar results, in input order
+        """
+        start_time = time.perf_counter()
+        chunks = [texts[offset:offset + self.chunk_size] for offset in range(0, len(texts), self.chunk_size)]
+        
+        results = BulkResults.concatenate(list(self.executor.map(_analyze_chunk, chunks)), texts)
+        
+        elapsed = time.perf_counter() - start_time
+        self.last_bulk_stats = {
+            'texts': len(texts),
+            'workers': self.workers,
+            'threads_per_worker': self.threads_per_worker,
+            'chunk_size': self.chunk_size,
+            'batch_size': self.batch_size,
+            'seconds': round(elapsed, 3),
+            'texts_per_second': round(len(texts) / elapsed, 1) if elapsed > 0 else 0.0
+        }
+        return results
+
+    def close(self):
+        """Shut the worker processes down."""
+        self.executor.shutdown()
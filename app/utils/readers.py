@@ -0,0 +1,199 @@
+import codecs
+import json
+import os
+from app.utils.metrics import metrics
+
+# Columns read from every format; anything else in the file is never parsed
+COLUMNS = ('feedback', 'department')
+
+def _cell(value):
+    """Convert a cell to the string form the CSV reader produces ('' for missing)."""
+    return '' if value is None else str(value)
+
+def _source(file):
+    """Get something the format libraries can open: a path or a binary stream."""
+    return file.stream if hasattr(file, 'stream') else file
+
+def _batches(records, batch_size):
+    """Group (feedback, department) pairs into lists of row dictionaries."""
+    batch = []
+    for feedback, department in records:
+        batch.append({'feedback': feedback, 'department': department})
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _read_csv(file, batch_size):
+    import pandas as pd
+    
+    reader = pd.read_csv(
+        _source(file),
+        chunksize=batch_size,
+        usecols=lambda column: column in COLUMNS,
+        dtype=str,
+        keep_default_na=False
+    )
+    for chunk in reader:
+        if 'feedback' not in chunk.columns:
+            raise ValueError("File must contain a 'feedback' column")
+        departments = chunk['department'] if 'department' in chunk.columns else [''] * len(chunk)
+        yield [
+            {'feedback': feedback, 'department': department}
+            for feedback, department in zip(chunk['feedback'], departments)
+        ]
+
+def _read_xlsx(file, batch_size):
+    from openpyxl import load_workbook
+    
+    # Read-only mode streams rows from the sheet XML instead of loading the workbook
+    workbook = load_workbook(_source(file), read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_cell(name).strip() for name in next(rows, ())]
+        if 'feedback' not in header:
+            raise ValueError("File must contain a 'feedback' column")
+        feedback_index = header.index('feedback')
+        department_index = header.index('department') if 'department' in header else None
+
+        def records():
+            for row in rows:
+                if not any(cell is not None for cell in row):
+                    continue
+                feedback = row[feedback_index] if feedback_index < len(row) else None
+                department = row[department_index] if department_index is not None and department_index < len(row) else None
+                yield _cell(feedback), _cell(department)
+        
+        yield from _batches(records(), batch_size)
+    finally:
+        workbook.close()
+
+def _read_jsonl(file, batch_size):
+    source = _source(file)
+    # A StreamReader only needs read(), unlike TextIOWrapper, which rejects the
+    # SpooledTemporaryFile Werkzeug uses for large uploads on Python < 3.11
+    stream = open(source, encoding='utf-8') if isinstance(source, (str, os.PathLike)) else codecs.getreader('utf-8')(source)
+
+    def records():
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Line {line_number} is not valid JSON: {str(e)}")
+            if not isinstance(record, dict):
+                raise ValueError(f"Line {line_number} is not a JSON object")
+            yield _cell(record.get('feedback')), _cell(record.get('department'))
+    
+    try:
+        yield from _batches(records(), batch_size)
+    finally:
+        # Only files opened here are closed; an uploaded file's stream stays usable
+        if isinstance(source, (str, os.PathLike)):
+            stream.close()
+
+def _read_parquet(file, batch_size):
+    import pyarrow.parquet as pq
+    
+    parquet_file = pq.ParquetFile(_source(file))
+    names = parquet_file.schema_arrow.names
+    if 'feedback' not in names:
+        raise ValueError("File must contain a 'feedback' column")
+    
+    # Only the needed column chunks are decoded, one record batch at a time
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size, columns=[name for name in COLUMNS if name in names]):
+        columns = record_batch.to_pydict()
+        departments = columns.get('department') or [None] * record_batch.num_rows
+        yield [
+            {'feedback': _cell(feedback), 'department': _cell(department)}
+            for feedback, department in zip(columns['feedback'], departments)
+        ]
+
+READERS = {
+    'csv': _read_csv,
+    'xlsx': _read_xlsx,
+    'jsonl': _read_jsonl,
+    'parquet': _read_parquet
+}
+
+# File extensions accepted by /upload, mapped to their format
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.xlsx': 'xlsx',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet'
+}
+
+def detect_format(filename):
+    """
+    Get the format of a feedback file from its extension.
+    
+    Args:
+        filename (str): Name or path of the file
+    
+    Returns:
+        str: One of READERS
+    
+    Raises:
+        ValueError: If the extension is not supported
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in EXTENSIONS:
+        raise ValueError(f"File must be one of: {', '.join(EXTENSIONS)}")
+    return EXTENSIONS[extension]
+
+def iter_feedback_batches(file, file_format=None, batch_size=1000):
+    """
+    Stream feedback rows from a CSV, XLSX, JSON Lines or Parquet file.
+    
+    Only the 'feedback' and 'department' columns are read, and at most
+    batch_size rows are held in memory at a time. Values are strings, with
+    '' for missing cells, whatever the format.
+    
+    Args:
+        file: FileStorage object or path of the file
+        file_format (str): One of READERS, detected from the file name if omitted
+        batch_size (int): Number of rows per batch
+    
+    Yields:
+        list: List of {'feedback': str, 'department': str} dictionaries
+    """
+    file_format = file_format or detect_format(getattr(file, 'filename', None) or str(file))
+    reader = READERS[file_format](file, batch_size)
+    stage = f"{file_format}_parse"
+    
+    try:
+        while True:
+            with metrics.timed(stage):
+                batch = next(reader, None)
+            if batch is None:
+                break
+            if metrics.enabled:
+                metrics.stage_items.inc(stage, amount=len(batch))
+            yield batch
+    
+    except Exception as e:
+        raise Exception(f"Error processing {file_format.upper()} file: {str(e)}")
+
+def count_rows(file, file_format=None):
+    """
+    Count the data rows of a feedback file without keeping it in memory.
+    
+    Args:
+        file: Path of the file
+        file_format (str): One of READERS, detected from the file name if omitted
+    
+    Returns:
+        int: Number of rows
+    """
+    file_format = file_format or detect_format(str(file))
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(file).metadata.num_rows
+    if file_format == 'jsonl':
+        with open(file, encoding='utf-8') as f:
+            return sum(1 for line in f if line.strip())
+    return sum(len(batch) for batch in READERS[file_format](file, 10000))
\ No newline at end of file
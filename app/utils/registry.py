@@ -0,0 +1,213 @@
+import threading
+import time
+from config import Config
+
+# Settings used until configure() is called with the application's config
+_config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+_instances = {}
+_locks = {}
+_locks_guard = threading.Lock()
+_load_seconds = {}
+_warm_up_guard = threading.Lock()
+_warm_up_thread = None
+_warm_up_error = None
+
+def configure(config):
+    """
+    Use the given settings for components that have not been created yet.
+    
+    Args:
+        config (dict): Application configuration, usually app.config
+    """
+    _config.update(config)
+
+def _get(name, factory):
+    """
+    Return the shared instance of a component, creating it on first use.
+    
+    Each component has its own lock, so a slow model load does not block
+    access to components that are already available.
+    
+    Args:
+        name (str): Name of the component
+        factory (callable): Builds the component from the configuration
+        
+    Returns:
+        object: The shared instance
+    """
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    
+    with _locks_guard:
+        lock = _locks.setdefault(name, threading.Lock())
+    
+    with lock:
+        instance = _instances.get(name)
+        if instance is None:
+            start_time = time.perf_counter()
+            instance = factory()
+            _load_seconds[name] = round(time.perf_counter() - start_time, 3)
+            _instances[name] = instance
+    return instance
+
+def get_sentiment_analyzer():
+    """Get the process-wide SentimentAnalyzer, loading the model on first use."""
+    def build():
+        from app.utils.sentiment_analyzer import SentimentAnalyzer
+        from app.utils.result_cache import ResultCache
+        return SentimentAnalyzer(
+            batch_size=_config['SENTIMENT_BATCH_SIZE'],
+            max_length=_config['SENTIMENT_MAX_LENGTH'],
+            backend=_config['SENTIMENT_BACKEND'],
+            num_threads=_config['SENTIMENT_NUM_THREADS'],
+            onnx_dir=_config['SENTIMENT_ONNX_DIR'],
+            long_text=_config['SENTIMENT_LONG_TEXT'],
+            chunk_overlap=_config['SENTIMENT_CHUNK_OVERLAP'],
+            max_document_tokens=_config['SENTIMENT_MAX_DOCUMENT_TOKENS'],
+            cache=ResultCache(
+                max_size=_config['SENTIMENT_CACHE_SIZE'],
+                path=_config['SENTIMENT_CACHE_PATH']
+            ) if _config['SENTIMENT_CACHE_SIZE'] else None
+        )
+    return _get('sentiment_analyzer', build)
+
+def get_bulk_analyzer():
+    """
+    Get the analyzer used for bulk jobs.
+    
+    With BULK_WORKERS above 1 this is a ProcessPoolAnalyzer spreading
+    chunks over worker processes; otherwise it is the shared in-process
+    SentimentAnalyzer.
+    """
+    if _config['BULK_WORKERS'] <= 1:
+        return get_sentiment_analyzer()
+    
+    def build():
+        from app.utils.process_pool import ProcessPoolAnalyzer
+        return ProcessPoolAnalyzer(
+            workers=_config['BULK_WORKERS'],
+            chunk_size=_config['BULK_CHUNK_SIZE'],
+            threads_per_worker=_config['BULK_THREADS_PER_WORKER'],
+            cache_size=_config['SENTIMENT_CACHE_SIZE'],
+            cache_path=_config['SENTIMENT_CACHE_PATH'],
+            batch_size=_config['SENTIMENT_BATCH_SIZE'],
+            max_length=_config['SENTIMENT_MAX_LENGTH'],
+            backend=_config['SENTIMENT_BACKEND'],
+            onnx_dir=_config['SENTIMENT_ONNX_DIR'],
+            long_text=_config['SENTIMENT_LONG_TEXT'],
+            chunk_overlap=_config['SENTIMENT_CHUNK_OVERLAP'],
+            max_document_tokens=_config['SENTIMENT_MAX_DOCUMENT_TOKENS']
+        )
+    return _get('bulk_analyzer', build)
+
+def get_micro_batcher():
+    """Get the process-wide MicroBatcher in front of the sentiment analyzer."""
+    def build():
+        from app.utils.micro_batcher import MicroBatcher
+        return MicroBatcher(
+            get_sentiment_analyzer(),
+            max_batch_size=_config['MICRO_BATCH_MAX_SIZE'],
+            max_wait_ms=_config['MICRO_BATCH_MAX_WAIT_MS']
+        )
+    return _get('micro_batcher', build)
+
+def get_avatar_generator():
+    """Get the process-wide AvatarGenerator."""
+    def build():
+        from app.utils.avatar_generator import AvatarGenerator
+        from app.utils.avatar_backends import create_avatar_backend
+        return AvatarGenerator(
+            backend=create_avatar_backend(_config['AVATAR_BACKEND']),
+            cache_dir=_config['AVATAR_CACHE_FOLDER'],
+            size=_config['AVATAR_SIZE']
+        )
+    return _get('avatar_generator', build)
+
+def get_video_generator():
+    """Get the process-wide VideoGenerator."""
+    def build():
+        from app.utils.video_generator import VideoGenerator
+        return VideoGenerator(
+            image_dir=_config['VIDEO_IMAGE_FOLDER'],
+            cache_dir=_config['VIDEO_CACHE_FOLDER']
+        )
+    return _get('video_generator', build)
+
+def is_loaded(name):
+    """
+    Check whether a component has been created.
+    
+    Args:
+        name (str): Name of the component, e.g. 'sentiment_analyzer'
+        
+    Returns:
+        bool: True once the component is available
+    """
+    return name in _instances
+
+def status():
+    """
+    Describe which components are loaded and how long they took.
+    
+    Returns:
+        dict: Component name mapped to its load state and load time
+    """
+    return {
+        name: {'loaded': name in _instances, 'load_seconds': _load_seconds.get(name)}
+        for name in ('sentiment_analyzer', 'avatar_generator', 'video_generator')
+    }
+
+def warm_up():
+    """
+    Load the sentiment model and run one inference so the first request is fast.
+    
+    Failed attempts are retried MODEL_WARMUP_ATTEMPTS times in all, waiting
+    MODEL_WARMUP_RETRY_DELAY seconds before the first retry and twice as
+    long before each further one.
+    
+    Returns:
+        bool: True if the model is ready
+    """
+    global _warm_up_error
+    attempts = max(_config['MODEL_WARMUP_ATTEMPTS'], 1)
+    delay = _config['MODEL_WARMUP_RETRY_DELAY']
+    for attempt in range(1, attempts + 1):
+        try:
+            get_sentiment_analyzer()._predict("Warm-up")
+            _warm_up_error = None
+            return True
+        except Exception as e:
+            _warm_up_error = str(e)
+            print(f"Error warming up sentiment model (attempt {attempt} of {attempts}): {str(e)}")
+            if attempt < attempts:
+                time.sleep(delay)
+                delay *= 2
+    return False
+
+def start_warm_up():
+    """
+    Run warm_up() in a background thread unless the model is loaded or already loading.
+    
+    Returns:
+        bool: True if a new warm-up was started
+    """
+    global _warm_up_thread
+    with _warm_up_guard:
+        if is_loaded('sentiment_analyzer') or (_warm_up_thread is not None and _warm_up_thread.is_alive()):
+            return False
+        _warm_up_thread = threading.Thread(target=warm_up, daemon=True, name='model-warm-up')
+        _warm_up_thread.start()
+        return True
+
+def warm_up_status():
+    """
+    Describe the background warm-up.
+    
+    Returns:
+        dict: Whether a warm-up is running and the error of the last failed attempt
+    """
+    return {
+        'running': _warm_up_thread is not None and _warm_up_thread.is_alive(),
+        'error': _warm_up_error
+    }
\ No newline at end of file
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+def normalize_text(text):
+    """
+    Normalize text so trivially different copies of the same feedback share a key.
+    
+    Whitespace is collapsed and case is folded; the sentiment model is uncased
+    and ignores whitespace, so this never changes the prediction.
+    
+    Args:
+        text (str): The text to normalize
+        
+    Returns:
+        str: Normalized text
+    """
+    return ' '.join(str(text).split()).casefold()
+
+class ResultCache:
+    def __init__(self, max_size=10000, path=None):
+        """
+        Bounded LRU cache of raw sentiment predictions.
+        
+        Args:
+            max_size (int): Maximum number of entries kept in memory
+            path (str): Optional SQLite file used as a persistent second tier
+        """
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS sentiment_cache ('
+                'key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL)'
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(text, model_id):
+        """
+        Build the content address for a text analyzed by a given model.
+        
+        Args:
+            text (str): The text being analyzed
+            model_id (str): Identifier of the model producing the prediction
+            
+        Returns:
+            str: Hex digest identifying the (model, normalized text) pair
+        """
+        content = f"{model_id}\x00{normalize_text(text)}"
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a single prediction.
+        
+        Args:
+            key (str): Key produced by make_key
+            
+        Returns:
+            dict: Prediction with 'label' and 'score', or None on a miss
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """
+        Look up several predictions at once.
+        
+        Args:
+            keys (list): Keys produced by make_key
+            
+        Returns:
+            dict: Mapping of key to prediction for every key that was found
+        """
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                else:
+                    missing.append(key)
+            
+            if missing and self._db is not None:
+                # Stay below SQLite's bound parameter limit
+                for offset in range(0, len(missing), 500):
+                    chunk = missing[offset:offset + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = self._db.execute(
+                        f'SELECT key, label, score FROM sentiment_cache WHERE key IN ({placeholders})',
+                        chunk
+                    ).fetchall()
+                    for key, label, score in rows:
+                        prediction = {'label': label, 'score': score}
+                        found[key] = prediction
+                        self._remember(key, prediction)
+            
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        
+        return found
+
+    def put(self, key, prediction):
+        """
+        Store a single prediction.
+        
+        Args:
+            key (str): Key produced by make_key
+            prediction (dict): Prediction with 'label' and 'score'
+        """
+        self.put_many({key: prediction})
+
+    def put_many(self, predictions):
+        """
+        Store several predictions in one write.
+        
+        Args:
+            predictions (dict): Mapping of key to prediction
+        """
+        if not predictions:
+            return
+        
+        with self._lock:
+            for key, prediction in predictions.items():
+                self._remember(key, {'label': prediction['label'], 'score': prediction['score']})
+            
+            if self._db is not None:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO sentiment_cache (key, label, score) VALUES (?, ?, ?)',
+                    [(key, p['label'], p['score']) for key, p in predictions.items()]
+                )
+                self._db.commit()
+
+    def _remember(self, key, prediction):
+        """Insert into the in-memory tier, evicting the least recently used entry."""
+        self._entries[key] = prediction
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry from both tiers and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM sentiment_cache')
+                self._db.commit()
+
+    def stats(self):
+        """
+        Get cache usage counters.
+        
+        Returns:
+            dict: Size, capacity, hits, misses and hit ratio
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'persistent': self._db is not None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+        }
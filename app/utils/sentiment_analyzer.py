@@ -1,15 +1,70 @@
-from transformers import pipeline
-import torch
+import time
+import numpy as np
+from app.utils.bulk_results import BulkResults
+from app.utils.result_cache import ResultCache
+from app.utils.inference_backends import build_pipeline
+from app.utils.metrics import metrics
 
 class SentimentAnalyzer:
-    def __init__(self):
-        # Initialize the sentiment analysis pipeline
-        self.sentiment_analyzer = pipeline(
-            "sentiment-analysis",
-            model="distilbert-base-uncased-finetuned-sst-2-english",
-            device=0 if torch.cuda.is_available() else -1
+    def __init__(self, batch_size=32, max_length=None, cache=None, backend='pytorch', num_threads=None,
+                 onnx_dir=None, long_text='chunk', chunk_overlap=64, max_document_tokens=4096):
+        # Check the long-text settings before the model is loaded
+        if max_document_tokens < 1:
+            raise ValueError(f"max_document_tokens must be at least 1, got {max_document_tokens}")
+        if chunk_overlap < 0:
+            raise ValueError(f"chunk_overlap must not be negative, got {chunk_overlap}")
+        
+        # Initialize the sentiment analysis pipeline on the selected inference backend
+        self.model_name = "distilbert-base-uncased-finetuned-sst-2-english"
+        self.backend = backend
+        self.sentiment_analyzer = build_pipeline(
+            self.model_name,
+            backend=backend,
+            num_threads=num_threads,
+            onnx_dir=onnx_dir
         )
         
+        # Time the pipeline's tokenization, model forward and output decoding separately
+        metrics.instrument(self.sentiment_analyzer, 'preprocess', 'tokenize')
+        metrics.instrument(self.sentiment_analyzer, 'forward', 'forward')
+        metrics.instrument(self.sentiment_analyzer, 'postprocess', 'postprocess')
+        
+        # Backends may differ slightly in their scores, so they don't share cached results
+        self.model_id = self.model_name if backend == 'pytorch' else f"{self.model_name}+{backend}"
+        
+        # Batching configuration for analyze_bulk
+        self.batch_size = batch_size
+        self.max_length = max_length or self._model_max_length()
+        
+        # Texts longer than the model limit are either cut off ('truncate') or split into
+        # overlapping windows whose scores are averaged ('chunk'), up to a token budget
+        tokenizer = self.sentiment_analyzer.tokenizer
+        if long_text == 'chunk' and not getattr(tokenizer, 'is_fast', False):
+            print("Long-text chunking needs a fast tokenizer; falling back to truncation")
+            long_text = 'truncate'
+        self.long_text = long_text
+        special_tokens = tokenizer.num_special_tokens_to_add() if hasattr(tokenizer, 'num_special_tokens_to_add') else 2
+        # A document budget below the model limit also caps the window, so it is never exceeded
+        self.window_tokens = min(self.max_length - special_tokens, max_document_tokens)
+        self.chunk_overlap = min(chunk_overlap, self.window_tokens // 2)
+        self.max_document_tokens = max_document_tokens
+        if long_text == 'chunk':
+            self.model_id = f"{self.model_id}+chunk{self.max_document_tokens}/{self.chunk_overlap}"
+        
+        # Optional ResultCache shared by single and bulk analysis
+        self.cache = cache
+        # Stats of the last bulk call, such as an upload; micro-batches don't replace them
+        self.last_bulk_stats = {
+            'texts': 0,
+            'unique_texts': 0,
+            'cache_hits': 0,
+            'inferred': 0,
+            'windows': 0,
+            'batch_size': self.batch_size,
+            'seconds': 0.0,
+            'texts_per_second': 0.0
+        }
+        
         # Define sentiment categories and their thresholds
         self.sentiment_categories = {
             'VERY_POSITIVE': {'min': 0.8, 'emoji': '😄', 'description': 'Very Positive'},
@@ -18,6 +73,28 @@ class SentimentAnalyzer:
             'NEGATIVE': {'min': -0.8, 'emoji': '🙁', 'description': 'Negative'},
             'VERY_NEGATIVE': {'min': float('-inf'), 'emoji': '😢', 'description': 'Very Negative'}
         }
+        
+        # The same categories as small-int codes in ascending order, for vectorized
+        # assignment with np.searchsorted in analyze_bulk_columnar
+        ordered = sorted(self.sentiment_categories.items(), key=lambda item: item[1]['min'])
+        self.category_codes = tuple(
+            {'name': name, 'emoji': info['emoji'], 'description': info['description']} for name, info in ordered
+        )
+        self.category_thresholds = np.array([info['min'] for _, info in ordered[1:]])
+        self.neutral_code = next(code for code, category in enumerate(self.category_codes) if category['name'] == 'NEUTRAL')
+
+    def _model_max_length(self):
+        """
+        Get the maximum input length supported by the model's tokenizer.
+        
+        Returns:
+            int: Maximum number of tokens per input
+        """
+        max_length = getattr(self.sentiment_analyzer.tokenizer, 'model_max_length', None)
+        # Some tokenizers report a huge sentinel value when no limit is configured
+        if not max_length or max_length > 100000:
+            return 512
+        return max_length
 
     def analyze_sentiment(self, text):
         """
@@ -30,36 +107,183 @@ class SentimentAnalyzer:
             dict: Dictionary containing sentiment analysis results
         """
         try:
-            # Get sentiment analysis result
-            result = self.sentiment_analyzer(text)[0]
-            
-            # Convert the score to our scale (-1 to 1)
-            # Hugging Face returns a score between 0 and 1, where 1 is positive
-            # We'll convert it to our -1 to 1 scale
-            score = (result['score'] * 2) - 1 if result['label'] == 'POSITIVE' else -result['score'] * 2 + 1
-            
-            # Determine sentiment category
-            category = self._get_sentiment_category(score)
-            
-            return {
-                'text': text,
-                'score': round(score, 3),
-                'category': category,
-                'emoji': self.sentiment_categories[category]['emoji'],
-                'description': self.sentiment_categories[category]['description'],
-                'confidence': round(result['score'], 3)
-            }
+            key = self._cache_key(text)
+            prediction = self.cache.get(key) if self.cache is not None else None
+            
+            if prediction is None:
+                prediction = self._predict(text)
+                if self.cache is not None:
+                    self.cache.put(key, prediction)
+            
+            with metrics.timed('categorize', items=1):
+                return self._build_result(text, prediction)
             
         except Exception as e:
             print(f"Error in sentiment analysis: {str(e)}")
-            return {
-                'text': text,
-                'score': 0,
-                'category': 'NEUTRAL',
-                'emoji': '😐',
-                'description': 'Neutral',
-                'confidence': 0
-            }
+            return self._fallback_result(text, e)
+
+    def _predict(self, text):
+        """
+        Run the model on a single text, bypassing the cache.
+        
+        A long text is split into windows that run as one batch.
+        
+        Args:
+            text (str): The text to analyze
+            
+        Returns:
+            dict: Raw pipeline prediction with 'label' and 'score'
+        """
+        windows = self._split_windows(text)
+        if len(windows) == 1:
+            return self._predict_window(windows[0][0])
+        
+        outputs = self.sentiment_analyzer(
+            [window for window, _ in windows],
+            batch_size=len(windows),
+            truncation=True,
+            max_length=self.max_length
+        )
+        return self._aggregate([(output, weight) for output, (_, weight) in zip(outputs, windows)])
+
+    def _predict_window(self, text):
+        """
+        Run the model on a text that fits its input limit (longer text is truncated).
+        
+        Args:
+            text (str): The text to analyze
+            
+        Returns:
+            dict: Raw pipeline prediction with 'label' and 'score'
+        """
+        return self.sentiment_analyzer(
+            text,
+            truncation=True,
+            max_length=self.max_length
+        )[0]
+
+    def _split_windows(self, text):
+        """
+        Split a text into overlapping windows that each fit the model.
+        
+        Windows are cut at token boundaries using the tokenizer's character
+        offsets, and neighbouring windows share chunk_overlap tokens so no
+        sentence loses its context. Tokens past max_document_tokens are
+        ignored.
+        
+        Args:
+            text (str): The text to split
+            
+        Returns:
+            list: (window text, number of tokens) pairs; a single pair holding
+                the text (cut at max_document_tokens) when it fits one window,
+                or the whole text when chunking is disabled
+        """
+        # Every token covers at least one character, so short texts never need tokenizing here
+        if self.long_text != 'chunk' or len(text) <= self.window_tokens:
+            return [(text, 1)]
+        
+        offsets = self.sentiment_analyzer.tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            truncation=False
+        )['offset_mapping'][:self.max_document_tokens]
+        if len(offsets) <= self.window_tokens:
+            # Cut after the last token kept, in case the text is longer than max_document_tokens
+            return [(text[:offsets[-1][1]] if offsets else text, 1)]
+        
+        windows = []
+        step = self.window_tokens - self.chunk_overlap
+        for start in range(0, len(offsets), step):
+            end = min(start + self.window_tokens, len(offsets))
+            windows.append((text[offsets[start][0]:offsets[end - 1][1]], end - start))
+            if end == len(offsets):
+                break
+        return windows
+
+    def _aggregate(self, outputs):
+        """
+        Combine window predictions into one prediction for the whole text.
+        
+        Window scores on our -1 to 1 scale are averaged weighted by window
+        length, and the result is expressed as a pipeline prediction again,
+        so it is cached and categorized like any other.
+        
+        Args:
+            outputs (list): (pipeline prediction, number of tokens) pairs
+            
+        Returns:
+            dict: Prediction with 'label' and 'score'
+        """
+        total = sum(weight for _, weight in outputs)
+        score = sum(
+            (output['score'] * 2 - 1) * (1 if output['label'] == 'POSITIVE' else -1) * weight
+            for output, weight in outputs
+        ) / total
+        # Inverse of the conversion in _build_result
+        return {'label': 'POSITIVE' if score >= 0 else 'NEGATIVE', 'score': (abs(score) + 1) / 2}
+
+    def _cache_key(self, text):
+        """
+        Get the content address of a text for this analyzer's model.
+        
+        Args:
+            text (str): The text to analyze
+            
+        Returns:
+            str: Key shared by every text that normalizes to the same content
+        """
+        return ResultCache.make_key(text, self.model_id)
+
+    def _build_result(self, text, result):
+        """
+        Convert a raw pipeline prediction into our result format.
+        
+        Args:
+            text (str): The analyzed text
+            result (dict): Pipeline output with 'label' and 'score'
+            
+        Returns:
+            dict: Dictionary containing sentiment analysis results
+        """
+        # Convert the score to our scale (-1 to 1)
+        # Hugging Face returns a score between 0 and 1, where 1 is positive
+        # We'll convert it to our -1 to 1 scale
+        score = (result['score'] * 2) - 1 if result['label'] == 'POSITIVE' else -result['score'] * 2 + 1
+        
+        # Determine sentiment category
+        category = self._get_sentiment_category(score)
+        
+        return {
+            'text': text,
+            'score': round(score, 3),
+            'category': category,
+            'emoji': self.sentiment_categories[category]['emoji'],
+            'description': self.sentiment_categories[category]['description'],
+            'confidence': round(result['score'], 3)
+        }
+
+    def _fallback_result(self, text, error):
+        """
+        Build the neutral result returned when a text could not be analyzed.
+        
+        Args:
+            text (str): The text that failed
+            error (Exception or str): The reason it failed
+            
+        Returns:
+            dict: Neutral result carrying an 'error' key
+        """
+        return {
+            'text': text,
+            'score': 0,
+            'category': 'NEUTRAL',
+            'emoji': '😐',
+            'description': 'Neutral',
+            'confidence': 0,
+            'error': str(error)
+        }
 
     def _get_sentiment_category(self, score):
         """
@@ -76,14 +300,139 @@ class SentimentAnalyzer:
                 return category
         return 'VERY_NEGATIVE'
 
-    def analyze_bulk(self, texts):
+    def analyze_bulk(self, texts, batch_size=None, record_stats=True):
         """
-        Analyze sentiment for multiple texts.
+        Analyze sentiment for multiple texts using batched inference.
         
         Args:
             texts (list): List of text strings to analyze
+            batch_size (int): Number of texts per forward pass, defaults to
+                the analyzer's configured batch size
+            record_stats (bool): Whether the call replaces last_bulk_stats
             
         Returns:
-            list: List of sentiment analysis results
+            list: List of sentiment analysis results, in input order
         """
-        return [self.analyze_sentiment(text) for text in texts] 
\ No newline at end of file
+        return self.analyze_bulk_columnar(texts, batch_size, record_stats).to_dicts()
+
+    def analyze_bulk_columnar(self, texts, batch_size=None, record_stats=True):
+        """
+        Analyze sentiment for multiple texts, returning columnar results.
+        
+        Duplicate texts are collapsed and answered from the cache where
+        possible, so only unique unseen texts reach the model. Long texts are
+        split into windows (see _split_windows), and all inputs are sorted by
+        length before batching so that each batch is padded to inputs of
+        similar size. If a batch fails, its inputs are retried one by one so
+        a single bad row only affects itself.
+        
+        Args:
+            texts (list): List of text strings to analyze
+            batch_size (int): Number of texts per forward pass, defaults to
+                the analyzer's configured batch size
+            record_stats (bool): Whether the call replaces last_bulk_stats;
+                the MicroBatcher reports its batches in its own stats instead
+            
+        Returns:
+            BulkResults: Scores, confidences and category codes in input order
+        """
+        batch_size = batch_size or self.batch_size
+        start_time = time.perf_counter()
+        row_errors = {}
+        
+        # Group rows by content so each distinct text is analyzed once;
+        # rows that are not text never reach the model
+        groups = {}
+        for i, text in enumerate(texts):
+            if isinstance(text, str) and text.strip():
+                groups.setdefault(self._cache_key(text), []).append(i)
+            else:
+                row_errors[i] = 'Feedback text is empty or not a string'
+        
+        predictions = self.cache.get_many(list(groups)) if self.cache is not None else {}
+        cache_hits = len(predictions)
+        
+        # Long texts contribute one input per window; sort by length so padding
+        # within each batch stays small
+        pending = [key for key in groups if key not in predictions]
+        inputs = [
+            (key, window, weight)
+            for key in pending
+            for window, weight in self._split_windows(texts[groups[key][0]])
+        ]
+        inputs.sort(key=lambda item: len(item[1]))
+        
+        window_outputs = {}
+        errors = {}
+        for offset in range(0, len(inputs), batch_size):
+            batch = inputs[offset:offset + batch_size]
+            
+            try:
+                outputs = self.sentiment_analyzer(
+                    [window for _, window, _ in batch],
+                    batch_size=len(batch),
+                    truncation=True,
+                    max_length=self.max_length
+                )
+            except Exception as e:
+                print(f"Error in batched sentiment analysis, retrying individually: {str(e)}")
+                outputs = None
+            
+            for position, (key, window, weight) in enumerate(batch):
+                try:
+                    output = outputs[position] if outputs is not None else self._predict_window(window)
+                    window_outputs.setdefault(key, []).append((output, weight))
+                except Exception as e:
+                    print(f"Error in sentiment analysis: {str(e)}")
+                    errors[key] = e
+        
+        computed = {
+            key: outputs[0][0] if len(outputs) == 1 else self._aggregate(outputs)
+            for key, outputs in window_outputs.items()
+            if key not in errors
+        }
+        predictions.update(computed)
+        if self.cache is not None:
+            self.cache.put_many(computed)
+        
+        with metrics.timed('categorize', items=len(texts)):
+            probabilities = np.zeros(len(texts))
+            positive = np.zeros(len(texts), dtype=bool)
+            for key, indices in groups.items():
+                if key in errors:
+                    row_errors.update((i, str(errors[key])) for i in indices)
+                else:
+                    probabilities[indices] = predictions[key]['score']
+                    positive[indices] = predictions[key]['label'] == 'POSITIVE'
+            
+            # Same conversion as _build_result, applied to all rows at once
+            scores = np.where(positive, probabilities * 2 - 1, 1 - probabilities * 2)
+            codes = np.searchsorted(self.category_thresholds, scores, side='right').astype(np.int8)
+            failed = list(row_errors)
+            scores[failed] = 0
+            probabilities[failed] = 0
+            codes[failed] = self.neutral_code
+            results = BulkResults(
+                texts,
+                scores.astype(np.float32),
+                probabilities.astype(np.float32),
+                codes,
+                row_errors,
+                self.category_codes
+            )
+        
+        elapsed = time.perf_counter() - start_time
+        if not record_stats:
+            return results
+        self.last_bulk_stats = {
+            'texts': len(texts),
+            'unique_texts': len(groups),
+            'cache_hits': cache_hits,
+            'inferred': len(pending),
+            'windows': len(inputs),
+            'batch_size': batch_size,
+            'seconds': round(elapsed, 3),
+            'texts_per_second': round(len(texts) / elapsed, 1) if elapsed > 0 else 0.0
+        }
+        
+        return results
@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+
+class StageTimings:
+    def __init__(self):
+        """
+        Collect the duration of each stage of a request, in milliseconds.
+        """
+        self.durations = {}
+
+    @contextmanager
+    def measure(self, name):
+        """
+        Time the enclosed block as a stage.
+        
+        Args:
+            name (str): Name of the stage
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start_time) * 1000)
+
+    def record(self, name, milliseconds):
+        """
+        Record the duration of a stage measured elsewhere.
+        
+        Args:
+            name (str): Name of the stage
+            milliseconds (float): Duration of the stage
+        """
+        self.durations[name] = milliseconds
+
+    def server_timing_header(self):
+        """
+        Format the durations as a Server-Timing header value.
+        
+        Returns:
+            str: Header value such as 'sentiment;dur=12.5, db;dur=3.1'
+        """
+        return ', '.join(f"{name};dur={duration:.1f}" for name, duration in self.durations.items())
+
+def run_timed(func, *args):
+    """
+    Call a function and measure how long it took.
+    
+    Args:
+        func (callable): The function to call
+        *args: Arguments passed to the function
+        
+    Returns:
+        tuple: (return value, duration in milliseconds)
+    """
+    start_time = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start_time) * 1000
+
+def wait_for_stage(future, name, timeout, timings):
+    """
+    Wait for a stage submitted with run_timed and record its duration.
+    
+    A stage that does not finish in time keeps running in the background
+    (so any cache it fills is still populated) but its result is dropped.
+    
+    Args:
+        future (Future): Future returned by submitting run_timed
+        name (str): Name of the stage
+        timeout (float): Seconds to wait for the stage
+        timings (StageTimings): Where the duration is recorded
+        
+    Returns:
+        object: The stage's return value, or None if it timed out or failed
+    """
+    try:
+        result, milliseconds = future.result(timeout=timeout)
+        timings.record(name, milliseconds)
+        return result
+    except FutureTimeoutError:
+        print(f"Stage {name} timed out after {timeout}s")
+        timings.record(name, timeout * 1000)
+        return None
+    except Exception as e:
+        print(f"Error in stage {name}: {str(e)}")
+        return None
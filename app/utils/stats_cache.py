@@ -0,0 +1,139 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+class StatsCache:
+    def __init__(self, ttl=30, max_size=256):
+        """
+        In-process cache of statistics responses.
+        
+        Entries are tagged with a version that is bumped whenever a
+        transaction that changed the rollup buckets commits, so feedback
+        stored by this process is visible immediately. Writes made by other
+        processes are picked up once the entry's TTL expires.
+        
+        Args:
+            ttl (float): Seconds an entry is served for, 0 disables caching
+            max_size (int): Maximum number of responses kept
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Apply the application's cache settings and watch commits for rollup changes.
+        
+        Args:
+            app (Flask): The Flask application
+        """
+        self.ttl = app.config['STATS_CACHE_TTL']
+        self.max_size = app.config['STATS_CACHE_SIZE']
+        if not event.contains(Session, 'after_commit', self._after_commit):
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+
+    def _after_commit(self, session):
+        if session.info.pop('rollups_changed', False):
+            self.invalidate()
+
+    def _after_rollback(self, session):
+        session.info.pop('rollups_changed', None)
+
+    def invalidate(self):
+        """Drop every cached response."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def get(self, key):
+        """
+        Look up a cached response body.
+        
+        Args:
+            key (tuple): Cache key
+        
+        Returns:
+            bytes: The response body, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self.version or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, body, version):
+        """
+        Store a response body computed while the cache was at a given version.
+        
+        A body computed before an invalidation is discarded rather than
+        stored, since it may predate the commit that caused it.
+        
+        Args:
+            key (tuple): Cache key
+            body (bytes): The response body
+            version (int): Value of self.version when computation started
+        """
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (version, time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def cached(self, view):
+        """
+        Decorate a view returning JSON so successful responses are cached per URL.
+        
+        Args:
+            view (callable): The view function
+        
+        Returns:
+            callable: The wrapped view
+        """
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if self.ttl <= 0:
+                return view(*args, **kwargs)
+            
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            body = self.get(key)
+            if body is not None:
+                return Response(body, mimetype='application/json', headers={'X-Cache': 'HIT'})
+            
+            version = self.version
+            response = view(*args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                self.put(key, response.get_data(), version)
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+
+    def stats(self):
+        """
+        Get cache usage counters.
+        
+        Returns:
+            dict: Size, capacity, TTL, hits and misses
+        """
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+stats_cache = StatsCache()
\ No newline at end of file
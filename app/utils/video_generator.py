@@ -1,105 +1,137 @@
 import os
 from PIL import Image
-import io
 import base64
+import glob
+import threading
 import numpy as np
-import moviepy.editor as mpy
+from app.utils.metrics import metrics
 
 class VideoGenerator:
-    def __init__(self):
+    def __init__(self, image_dir='static/images', cache_dir='static/videos'):
         # Define paths for different sentiment images
         self.sentiment_images = {
-            'VERY_POSITIVE': 'static/images/very_positive.jpg',
-            'POSITIVE': 'static/images/positive.jpg',
-            'NEUTRAL': 'static/images/neutral.jpg',
-            'NEGATIVE': 'static/images/negative.jpg',
-            'VERY_NEGATIVE': 'static/images/very_negative.jpg'
+            'VERY_POSITIVE': os.path.join(image_dir, 'very_positive.jpg'),
+            'POSITIVE': os.path.join(image_dir, 'positive.jpg'),
+            'NEUTRAL': os.path.join(image_dir, 'neutral.jpg'),
+            'NEGATIVE': os.path.join(image_dir, 'negative.jpg'),
+            'VERY_NEGATIVE': os.path.join(image_dir, 'very_negative.jpg')
         }
         
-        # Create static/images directory if it doesn't exist
-        os.makedirs('static/images', exist_ok=True)
+        # Rendered videos are cached here and reused until the source image changes
+        self.cache_dir = cache_dir
+        self._render_locks = {category: threading.Lock() for category in self.sentiment_images}
+        
+        # Create the image and cache directories if they don't exist
+        os.makedirs(image_dir, exist_ok=True)
+        os.makedirs(cache_dir, exist_ok=True)
 
-    def generate_video(self, sentiment_category, duration=4):
+    def get_video_path(self, sentiment_category, duration=4):
         """
-        Generate a video based on the sentiment category using local images.
+        Get the cached video for a sentiment category, rendering it on first use.
+        
+        Videos are keyed by category, source image modification time and
+        duration, so editing an image or changing the duration produces a
+        new file while every other request reuses the existing one.
         
         Args:
             sentiment_category (str): The sentiment category
             duration (int): Duration of the video in seconds
             
         Returns:
-            str: Base64 encoded video data
+            str: Path of the MP4 file, or None if it could not be rendered
         """
         try:
-            # Get the appropriate image path for the sentiment
-            image_path = self.sentiment_images.get(sentiment_category, self.sentiment_images['NEUTRAL'])
-            
-            # Create a list of frames using the same image
-            frames = []
-            for _ in range(4):  # We'll use the same image 4 times
-                with open(image_path, 'rb') as img_file:
-                    img_data = img_file.read()
-                    frames.append(base64.b64encode(img_data).decode('utf-8'))
-            
-            # Create video from frames
-            video_data = self._create_video_from_frames(frames, duration)
-            
-            return video_data
+            if sentiment_category not in self.sentiment_images:
+                sentiment_category = 'NEUTRAL'
+            image_path = self.sentiment_images[sentiment_category]
+            
+            mtime = os.stat(image_path).st_mtime_ns
+            filename = f"{sentiment_category.lower()}_{mtime}_{duration}s.mp4"
+            video_path = os.path.join(self.cache_dir, filename)
+            
+            if os.path.exists(video_path):
+                if metrics.enabled:
+                    metrics.media_cache.inc('video', 'hit')
+                return video_path
+            
+            # Only one thread renders a given category; the others wait and reuse it
+            with self._render_locks[sentiment_category]:
+                if not os.path.exists(video_path):
+                    if metrics.enabled:
+                        metrics.media_cache.inc('video', 'miss')
+                    with metrics.timed('video', items=1):
+                        self._render_video(image_path, video_path, duration)
+                    self._remove_stale_videos(sentiment_category, video_path)
+            
+            return video_path
             
         except Exception as e:
             print(f"Error generating video: {str(e)}")
             return None
 
-    def _create_video_from_frames(self, frames, duration):
+    def generate_video(self, sentiment_category, duration=4):
         """
-        Create a video from a list of base64 encoded frames.
+        Generate a video based on the sentiment category using local images.
         
         Args:
-            frames (list): List of base64 encoded image data
+            sentiment_category (str): The sentiment category
             duration (int): Duration of the video in seconds
             
         Returns:
             str: Base64 encoded video data
         """
-        try:
-            # Convert base64 frames to PIL Images
-            pil_frames = []
-            for frame in frames:
-                image_data = base64.b64decode(frame)
-                image = Image.open(io.BytesIO(image_data))
-                pil_frames.append(image)
-            
-            # Create video clips from frames
-            clips = []
-            frame_duration = duration / len(frames)
-            
-            for frame in pil_frames:
-                # Convert PIL Image to numpy array
-                frame_array = np.array(frame)
-                # Create video clip
-                clip = mpy.ImageClip(frame_array).set_duration(frame_duration)
-                clips.append(clip)
-            
-            # Concatenate clips
-            final_clip = mpy.concatenate_videoclips(clips)
-            
-            # Write to temporary file
-            temp_path = "temp_video.mp4"
-            final_clip.write_videofile(temp_path, fps=24)
-            
-            # Read the video file and convert to base64
-            with open(temp_path, "rb") as video_file:
-                video_data = base64.b64encode(video_file.read()).decode('utf-8')
-            
-            # Clean up
-            os.remove(temp_path)
-            final_clip.close()
-            
-            return video_data
-            
-        except Exception as e:
-            print(f"Error creating video: {str(e)}")
+        video_path = self.get_video_path(sentiment_category, duration)
+        if video_path is None:
             return None
+        
+        with open(video_path, 'rb') as video_file:
+            return base64.b64encode(video_file.read()).decode('utf-8')
+
+    def warm_cache(self, duration=4):
+        """
+        Render the videos for every sentiment category ahead of time.
+        
+        Args:
+            duration (int): Duration of the videos in seconds
+        """
+        for category in self.sentiment_images:
+            self.get_video_path(category, duration)
+
+    def _render_video(self, image_path, video_path, duration):
+        """
+        Render a still image into an MP4 file.
+        
+        Args:
+            image_path (str): Path of the source image
+            video_path (str): Path the video is written to
+            duration (int): Duration of the video in seconds
+        """
+        # moviepy pulls in ffmpeg tooling, so only import it when a video is rendered
+        import moviepy.editor as mpy
+        
+        frame_array = np.array(Image.open(image_path).convert('RGB'))
+        clip = mpy.ImageClip(frame_array).set_duration(duration)
+        
+        # Write to a temporary file first so readers never see a partial video
+        temp_path = f"{video_path}.{threading.get_ident()}.tmp.mp4"
+        try:
+            clip.write_videofile(temp_path, fps=24, logger=None)
+            os.replace(temp_path, video_path)
+        finally:
+            clip.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _remove_stale_videos(self, sentiment_category, current_path):
+        """Delete videos rendered from an older version of a category's image."""
+        pattern = os.path.join(self.cache_dir, f"{sentiment_category.lower()}_*.mp4")
+        for path in glob.glob(pattern):
+            # Temporary files belong to renders still in progress in other threads or processes
+            if path != current_path and not path.endswith('.tmp.mp4'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
 
     def save_video(self, base64_data, filename):
         """
@@ -118,4 +150,4 @@ class VideoGenerator:
                 f.write(video_data)
             
         except Exception as e:
-            print(f"Error saving video: {str(e)}") 
\ No newline at end of file
+            print(f"Error saving video: {str(e)}")
@@ -0,0 +1,123 @@
+"""
+Check that an alternative inference backend agrees with the PyTorch baseline.
+
+Runs the same texts through SentimentAnalyzer on the 'pytorch' backend and
+on a candidate backend ('quantized' or 'onnx'), then reports:
+
+- agreement of sentiment categories and of positive/negative labels
+- mean and maximum absolute score difference
+- single-text latency (p50/p95) and bulk throughput for both backends
+
+Exits with status 1 when category agreement is below --min-agreement, so
+it can gate a configuration change.
+
+Usage:
+    python benchmarks/backend_parity.py --backend quantized
+    python benchmarks/backend_parity.py --backend onnx --input sample_feedback.csv --synthetic 2000
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.utils.sentiment_analyzer import SentimentAnalyzer
+from benchmarks.synthetic import generate_feedback
+
+def load_texts(path, synthetic):
+    """
+    Load feedback texts from a CSV file and top them up with synthetic rows.
+    
+    Args:
+        path (str): CSV file with a 'feedback' column
+        synthetic (int): Number of synthetic texts to add
+        
+    Returns:
+        list: Feedback texts
+    """
+    with open(path, newline='') as f:
+        texts = [row['feedback'] for row in csv.DictReader(f) if row.get('feedback')]
+    texts.extend(row['feedback'] for row in generate_feedback(synthetic))
+    return texts
+
+def measure(analyzer, texts, latency_samples):
+    """
+    Run texts through an analyzer and time it.
+    
+    Args:
+        analyzer (SentimentAnalyzer): Analyzer without a result cache
+        texts (list): Texts to analyze
+        latency_samples (int): Number of texts timed one by one
+        
+    Returns:
+        tuple: (results, performance dict)
+    """
+    latencies = []
+    for text in texts[:latency_samples]:
+        start_time = time.perf_counter()
+        analyzer.analyze_sentiment(text)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    latencies.sort()
+    
+    start_time = time.perf_counter()
+    results = analyzer.analyze_bulk(texts)
+    elapsed = time.perf_counter() - start_time
+    
+    return results, {
+        'single_p50_ms': round(statistics.median(latencies), 2),
+        'single_p95_ms': round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        'bulk_texts_per_second': round(len(texts) / elapsed, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', required=True, choices=['quantized', 'onnx'], help='Candidate backend')
+    parser.add_argument('--input', default=os.path.join(ROOT, 'sample_feedback.csv'), help='CSV with a feedback column')
+    parser.add_argument('--synthetic', type=int, default=1000, help='Synthetic texts added to the input')
+    parser.add_argument('--threads', type=int, default=None, help='Intra-op threads for both backends')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--latency-samples', type=int, default=100)
+    parser.add_argument('--min-agreement', type=float, default=0.98, help='Required category agreement')
+    parser.add_argument('--output', help='Write the report to this JSON file')
+    args = parser.parse_args()
+    
+    texts = load_texts(args.input, args.synthetic)
+    
+    baseline = SentimentAnalyzer(batch_size=args.batch_size, backend='pytorch', num_threads=args.threads)
+    candidate = SentimentAnalyzer(batch_size=args.batch_size, backend=args.backend, num_threads=args.threads)
+    
+    baseline_results, baseline_perf = measure(baseline, texts, args.latency_samples)
+    candidate_results, candidate_perf = measure(candidate, texts, args.latency_samples)
+    
+    pairs = list(zip(baseline_results, candidate_results))
+    score_diffs = [abs(b['score'] - c['score']) for b, c in pairs]
+    category_agreement = sum(b['category'] == c['category'] for b, c in pairs) / len(pairs)
+    label_agreement = sum((b['score'] >= 0) == (c['score'] >= 0) for b, c in pairs) / len(pairs)
+    
+    report = {
+        'texts': len(texts),
+        'candidate': args.backend,
+        'category_agreement': round(category_agreement, 4),
+        'label_agreement': round(label_agreement, 4),
+        'mean_abs_score_diff': round(statistics.mean(score_diffs), 4),
+        'max_abs_score_diff': round(max(score_diffs), 4),
+        'pytorch': baseline_perf,
+        args.backend: candidate_perf,
+        'single_latency_speedup': round(baseline_perf['single_p50_ms'] / candidate_perf['single_p50_ms'], 2),
+        'bulk_throughput_speedup': round(candidate_perf['bulk_texts_per_second'] / baseline_perf['bulk_texts_per_second'], 2),
+        'passed': category_agreement >= args.min_agreement
+    }
+    
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if report['passed'] else 1)
+
+if __name__ == '__main__':
+    main()
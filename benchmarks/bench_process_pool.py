@@ -0,0 +1,81 @@
+"""
+Measure how bulk analysis scales with the number of worker processes.
+
+Generates a synthetic feedback CSV (100k rows by default), then analyzes
+its texts with ProcessPoolAnalyzer at each worker count. Workers are
+started and their models loaded before timing, so the numbers reflect
+steady-state throughput. Reports rows/sec, speedup over the first worker
+count and parallel efficiency (speedup relative to the added workers).
+
+Usage:
+    python benchmarks/bench_process_pool.py --rows 100000 --workers 1 2 4 8 16 32
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.utils.process_pool import ProcessPoolAnalyzer
+from benchmarks.synthetic import write_feedback_csv
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    default_workers = [n for n in (1, 2, 4, 8, 16, 32) if n <= cpu_count]
+    
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help='Rows in the synthetic CSV')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers, help='Worker counts to measure')
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--backend', default='pytorch')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_feedback_csv(os.path.join(tmp, 'feedback.csv'), args.rows)
+        with open(path, newline='') as f:
+            texts = [row['feedback'] for row in csv.DictReader(f)]
+    
+    results = []
+    for workers in args.workers:
+        pool = ProcessPoolAnalyzer(
+            workers=workers,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            backend=args.backend
+        )
+        try:
+            pool.warm_up()
+            start_time = time.perf_counter()
+            pool.analyze_bulk(texts)
+            elapsed = time.perf_counter() - start_time
+        finally:
+            pool.close()
+        
+        # Speedup and efficiency are relative to the first (smallest) worker count
+        rows_per_second = len(texts) / elapsed
+        first = results[0] if results else {'workers': workers, 'rows_per_second': rows_per_second}
+        speedup = rows_per_second / first['rows_per_second']
+        results.append({
+            'workers': workers,
+            'threads_per_worker': pool.threads_per_worker,
+            'seconds': round(elapsed, 2),
+            'rows_per_second': round(rows_per_second, 1),
+            'speedup': round(speedup, 2),
+            'efficiency': round(speedup / (workers / first['workers']), 2)
+        })
+        print(json.dumps(results[-1]), flush=True)
+    
+    report = {'rows': len(texts), 'cpu_count': cpu_count, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Measure upload parsing speed and memory for each supported file format.
+
+Writes the same synthetic feedback (500k rows by default, with two extra
+columns the readers should skip) as CSV, XLSX, JSON Lines and Parquet,
+then reads every file in a fresh process and reports rows/sec and peak
+resident memory. Each format is read with the streaming reader behind
+/upload and, with --eager, with the matching pandas function for
+comparison. Peak memory includes the interpreter and libraries; the
+baseline_mb field is the peak before the file is opened.
+
+Usage:
+    python benchmarks/bench_readers.py --rows 500000
+    python benchmarks/bench_readers.py --formats csv parquet --eager --output readers.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FORMATS = ('csv', 'xlsx', 'jsonl', 'parquet')
+
+def _peak_rss_mb():
+    # VmHWM belongs to this process image only; ru_maxrss on Linux keeps the
+    # peak of the parent that forked it, so it is just the fallback elsewhere
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _read_eager(path, file_format):
+    import pandas as pd
+    
+    columns = ['feedback', 'department']
+    if file_format == 'csv':
+        frame = pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False)
+    elif file_format == 'xlsx':
+        frame = pd.read_excel(path, usecols=columns, dtype=str)
+    elif file_format == 'jsonl':
+        frame = pd.read_json(path, lines=True, dtype=False)[columns]
+    else:
+        frame = pd.read_parquet(path, columns=columns)
+    return len(frame.to_dict('records'))
+
+def measure(path, file_format, mode, batch_size):
+    """
+    Read one file and report throughput and memory (run in a child process).
+    
+    Args:
+        path (str): File to read
+        file_format (str): One of FORMATS
+        mode (str): 'stream' for the upload reader, 'eager' for pandas
+        batch_size (int): Rows per batch in streaming mode
+    
+    Returns:
+        dict: Rows read, seconds, rows/sec and memory figures
+    """
+    import pandas  # noqa: F401 - imported before the baseline so both modes start equal
+    from app.utils.readers import iter_feedback_batches
+    
+    baseline = _peak_rss_mb()
+    start_time = time.perf_counter()
+    if mode == 'stream':
+        rows = sum(len(batch) for batch in iter_feedback_batches(path, file_format, batch_size))
+    else:
+        rows = _read_eager(path, file_format)
+    elapsed = time.perf_counter() - start_time
+    
+    return {
+        'format': file_format,
+        'mode': mode,
+        'rows': rows,
+        'file_mb': round(os.path.getsize(path) / (1024 * 1024), 1),
+        'seconds': round(elapsed, 2),
+        'rows_per_second': round(rows / elapsed, 1) if elapsed else None,
+        'baseline_mb': baseline,
+        'peak_mb': _peak_rss_mb()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500000, help='Rows in each synthetic file')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per batch yielded by the reader')
+    parser.add_argument('--eager', action='store_true', help='Also read each file with pandas in one go')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--measure', nargs=3, metavar=('PATH', 'FORMAT', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.measure:
+        path, file_format, mode = args.measure
+        print(json.dumps(measure(path, file_format, mode, args.batch_size)))
+        return
+    
+    from benchmarks.synthetic import write_feedback_file
+    
+    results = []
+    modes = ['stream', 'eager'] if args.eager else ['stream']
+    with tempfile.TemporaryDirectory() as tmp:
+        for file_format in args.formats:
+            path = os.path.join(tmp, f'feedback.{file_format}')
+            write_feedback_file(path, args.rows, file_format)
+            for mode in modes:
+                # A fresh process per reading keeps the peak memory of one from hiding another's
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--measure', path, file_format, mode,
+                     '--batch-size', str(args.batch_size)],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                results.append(json.loads(output.strip().splitlines()[-1]))
+                print(json.dumps(results[-1]), flush=True)
+            os.remove(path)
+    
+    report = {'rows': args.rows, 'batch_size': args.batch_size, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
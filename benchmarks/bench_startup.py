@@ -0,0 +1,97 @@
+"""
+Measure cold start of the web application.
+
+Each measurement runs in a fresh interpreter against a temporary database:
+
+- boot: importing the app and running create_app (what a new worker pays
+  before it can accept connections)
+- model_load: loading the sentiment model through the registry
+- first_analyze: the first /analyze request after boot
+- eager_boot: boot followed by loading every component up front, which is
+  what workers paid when models were created at import time
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 3] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+from app.utils import registry
+app = create_app()
+boot = time.perf_counter() - start
+timings = {'boot': boot}
+
+if sys.argv[1] == 'eager':
+    registry.get_sentiment_analyzer()
+    registry.get_avatar_generator()
+    registry.get_video_generator()
+    timings['eager_boot'] = time.perf_counter() - start
+else:
+    load_start = time.perf_counter()
+    registry.get_sentiment_analyzer()
+    timings['model_load'] = time.perf_counter() - load_start
+    request_start = time.perf_counter()
+    app.test_client().post('/analyze?media=deferred', json={'text': 'The onboarding was great', 'department': 'HR'})
+    timings['first_analyze'] = time.perf_counter() - request_start
+
+print(json.dumps(timings))
+'''
+
+def run_child(mode):
+    """
+    Run one cold-start measurement in a fresh interpreter.
+    
+    Args:
+        mode (str): 'lazy' or 'eager'
+        
+    Returns:
+        dict: Measured durations in seconds
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        env['AVATAR_CACHE_FOLDER'] = os.path.join(tmp, 'avatars')
+        env['VIDEO_CACHE_FOLDER'] = os.path.join(tmp, 'videos')
+        env['VIDEO_IMAGE_FOLDER'] = os.path.join(tmp, 'images')
+        env.setdefault('AVATAR_BACKEND', 'local')
+        env['MODEL_WARMUP'] = 'false'
+        env['VIDEO_PREBUILD'] = 'false'
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD, mode],
+            cwd=ROOT, env=env, check=True, capture_output=True, text=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help='Measurements per mode')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+    
+    samples = {}
+    for mode in ('lazy', 'eager'):
+        for _ in range(args.runs):
+            for name, seconds in run_child(mode).items():
+                samples.setdefault(name, []).append(seconds)
+    
+    results = {name: round(statistics.median(values), 3) for name, values in samples.items()}
+    results['boot_speedup'] = round(results['eager_boot'] / results['boot'], 1) if results['boot'] else None
+    
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,403 @@
+"""
+Performance benchmark suite.
+
+Exercises the main hot paths against synthetic data generated offline and
+writes machine-readable results:
+
+- inference_single: SentimentAnalyzer.analyze_sentiment, one text per call
+- inference_bulk: SentimentAnalyzer.analyze_bulk on batches of texts
+- inference_long: analyze_bulk on long documents, chunked into windows and truncated
+- csv_parse: process_csv on a synthetic upload file
+- persistence: FeedbackWriter bulk inserts (including rollup updates)
+- stats: GET /stats against a feedback table seeded with --stats-rows rows
+- trends: GET /stats/trends and /stats/timeseries on the same rows, uncached and cached
+- video: VideoGenerator.generate_video, cold render and cached
+- analyze_endpoint: POST /analyze end to end, with the avatar backend stubbed
+
+OpenAI is never called: avatars come from a stub backend. Pass --stub-model
+to also replace the transformer with a deterministic stub, which is useful
+for smoke-testing the suite itself but not for measuring inference.
+
+Each case reports p50/p95/p99/mean latency per operation and throughput in
+items per second. Results can be compared against a saved baseline; the
+run fails when a case regresses by more than --tolerance.
+
+Usage:
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --cases stats persistence --stats-rows 100000
+    python benchmarks/suite.py --baseline baseline.json --tolerance 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import DEPARTMENTS, generate_feedback, write_feedback_csv
+
+SENTIMENTS = ['VERY_POSITIVE', 'POSITIVE', 'NEUTRAL', 'NEGATIVE', 'VERY_NEGATIVE']
+
+def percentile(sorted_values, fraction):
+    """
+    Get a percentile of already sorted values using the nearest-rank method.
+    
+    Args:
+        sorted_values (list): Values in ascending order
+        fraction (float): Percentile as a fraction, e.g. 0.95
+        
+    Returns:
+        float: The percentile value
+    """
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies, items_per_operation=1):
+    """
+    Summarize operation latencies.
+    
+    Args:
+        latencies (list): Duration of each operation in seconds
+        items_per_operation (int): Items processed by each operation, for throughput
+        
+    Returns:
+        dict: Latency percentiles in milliseconds and throughput in items/sec
+    """
+    values = sorted(latencies)
+    total = sum(values)
+    return {
+        'samples': len(values),
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'mean_ms': round(total / len(values) * 1000, 3),
+        'throughput_per_second': round(len(values) * items_per_operation / total, 1) if total > 0 else None
+    }
+
+def timed(func, *args):
+    """Return how long a call took, in seconds."""
+    start_time = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start_time
+
+class StubAvatarBackend:
+    """Avatar backend standing in for OpenAI; draws locally and never touches the network."""
+    name = 'stub'
+
+    def __init__(self):
+        from app.utils.avatar_backends import LocalAvatarBackend
+        self._local = LocalAvatarBackend()
+
+    def render(self, sentiment_category, prompt, size):
+        return self._local.render(sentiment_category, prompt, size)
+
+class StubPipeline:
+    """Deterministic stand-in for the transformers pipeline, used with --stub-model."""
+
+    class tokenizer:
+        model_max_length = 512
+        is_fast = True
+        
+        def __new__(cls, text, **kwargs):
+            # Whitespace "tokens" with character offsets, enough for long-text chunking
+            return {'offset_mapping': [match.span() for match in re.finditer(r'\S+', text)]}
+
+    def __call__(self, inputs, **kwargs):
+        texts = [inputs] if isinstance(inputs, str) else inputs
+        return [
+            {'label': 'POSITIVE' if len(text) % 2 else 'NEGATIVE', 'score': 0.5 + (len(text) % 50) / 100}
+            for text in texts
+        ]
+
+# Benchmark cases -------------------------------------------------------------
+
+def bench_inference_single(ctx):
+    analyzer = ctx['analyzer']
+    texts = [row['feedback'] for row in generate_feedback(ctx['args'].samples, seed=1)]
+    analyzer.analyze_sentiment(texts[0])
+    return summarize([timed(analyzer.analyze_sentiment, text) for text in texts])
+
+def bench_inference_bulk(ctx):
+    analyzer = ctx['analyzer']
+    batch = ctx['args'].bulk_size
+    texts = [row['feedback'] for row in generate_feedback(batch * ctx['args'].bulk_runs, seed=2)]
+    chunks = [texts[offset:offset + batch] for offset in range(0, len(texts), batch)]
+    return summarize([timed(analyzer.analyze_bulk, chunk) for chunk in chunks], items_per_operation=batch)
+
+def bench_inference_long(ctx):
+    analyzer = ctx['analyzer']
+    batch = ctx['args'].long_size
+    texts = [row['feedback'] for row in generate_feedback(
+        batch * ctx['args'].bulk_runs, seed=6, long_fraction=1.0, duplicate_fraction=0, long_sentences=(60, 200)
+    )]
+    chunks = [texts[offset:offset + batch] for offset in range(0, len(texts), batch)]
+    
+    results = {}
+    mode = analyzer.long_text
+    try:
+        for long_text in ('chunk', 'truncate'):
+            analyzer.long_text = long_text
+            results[long_text] = summarize([timed(analyzer.analyze_bulk, chunk) for chunk in chunks], items_per_operation=batch)
+            results[long_text]['windows_per_text'] = round(analyzer.last_bulk_stats['windows'] / batch, 2)
+    finally:
+        analyzer.long_text = mode
+    return results
+
+def bench_csv_parse(ctx):
+    from app.utils.file_processor import process_csv
+    rows = ctx['args'].csv_rows
+    path = write_feedback_csv(os.path.join(ctx['tmp'], 'upload.csv'), rows, seed=3)
+    return summarize([timed(process_csv, path) for _ in range(ctx['args'].csv_runs)], items_per_operation=rows)
+
+def bench_persistence(ctx):
+    from app.utils.feedback_writer import FeedbackWriter
+    batch = ctx['args'].write_batch_size
+    writer = FeedbackWriter(batch_size=batch)
+    result = {'category': 'POSITIVE', 'score': 0.5, 'confidence': 0.75}
+    feedback = generate_feedback(batch * ctx['args'].write_runs, seed=4)
+    rows = [FeedbackWriter.build_row(row['feedback'], row['department'], result) for row in feedback]
+    batches = [rows[offset:offset + batch] for offset in range(0, len(rows), batch)]
+    with ctx['app'].app_context():
+        return summarize([timed(writer.write, rows) for rows in batches], items_per_operation=batch)
+
+def seed_feedback(app, count):
+    """Insert count synthetic feedback rows spread over a year, then rebuild the rollups."""
+    from app import db
+    from app.models.feedback import Feedback
+    from app.models.rollup import rebuild_rollups
+    
+    start = datetime.utcnow() - timedelta(days=365)
+    step = 365 * 24 * 3600 / max(count, 1)
+    with app.app_context():
+        for offset in range(0, count, 50000):
+            db.session.execute(Feedback.__table__.insert(), [
+                {
+                    'text': 'Synthetic feedback',
+                    'department': DEPARTMENTS[i % len(DEPARTMENTS)],
+                    'sentiment': SENTIMENTS[i % len(SENTIMENTS)],
+                    'score': ((i * 37) % 200 - 100) / 100,
+                    'confidence': 0.5 + (i % 50) / 100,
+                    'timestamp': start + timedelta(seconds=i * step)
+                }
+                for i in range(offset, min(offset + 50000, count))
+            ])
+            db.session.commit()
+        rebuild_rollups()
+
+def get_latencies(client, queries, samples):
+    """Time GET requests cycling through queries, failing on any non-200 response."""
+    latencies = []
+    for i in range(samples):
+        url = queries[i % len(queries)]
+        start_time = time.perf_counter()
+        response = client.get(url)
+        latencies.append(time.perf_counter() - start_time)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+    return latencies
+
+def ensure_seeded(ctx):
+    if not ctx.get('seeded'):
+        seed_feedback(ctx['app'], ctx['args'].stats_rows)
+        ctx['seeded'] = True
+
+def bench_stats(ctx):
+    ensure_seeded(ctx)
+    queries = ['/stats', '/stats?department=HR', '/stats?window=7d', '/stats?department=IT&window=30d']
+    return summarize(get_latencies(ctx['app'].test_client(), queries, ctx['args'].samples))
+
+def bench_trends(ctx):
+    from app.utils.stats_cache import stats_cache
+    ensure_seeded(ctx)
+    client = ctx['app'].test_client()
+    queries = [
+        '/stats/trends?interval=month',
+        '/stats/trends?interval=week&department=HR&department=IT',
+        '/stats/timeseries?interval=hour&window=7d',
+        '/stats/timeseries?interval=minute&window=6h'
+    ]
+    results = {'uncached': summarize(get_latencies(client, queries, ctx['args'].samples))}
+    stats_cache.ttl = 60
+    try:
+        results['cached'] = summarize(get_latencies(client, queries, ctx['args'].samples))
+    finally:
+        stats_cache.ttl = 0
+    return results
+
+def bench_video(ctx):
+    from PIL import Image
+    from app.utils.video_generator import VideoGenerator
+    image_dir = os.path.join(ctx['tmp'], 'images')
+    os.makedirs(image_dir, exist_ok=True)
+    for i, category in enumerate(SENTIMENTS):
+        Image.new('RGB', (512, 512), (40 * i, 120, 200 - 30 * i)).save(os.path.join(image_dir, f"{category.lower()}.jpg"))
+    
+    generator = VideoGenerator(image_dir=image_dir, cache_dir=os.path.join(ctx['tmp'], 'videos'))
+    cold = [timed(generator.generate_video, category) for category in SENTIMENTS]
+    warm = [timed(generator.generate_video, SENTIMENTS[i % len(SENTIMENTS)]) for i in range(ctx['args'].samples)]
+    return {'cold': summarize(cold), 'cached': summarize(warm)}
+
+def bench_analyze_endpoint(ctx):
+    client = ctx['app'].test_client()
+    texts = [row['feedback'] for row in generate_feedback(ctx['args'].samples, seed=5)]
+    client.post('/analyze', json={'text': texts[0], 'department': 'HR'})
+    latencies = []
+    for text in texts:
+        start_time = time.perf_counter()
+        response = client.post('/analyze', json={'text': text, 'department': 'HR'})
+        latencies.append(time.perf_counter() - start_time)
+        if response.status_code != 200:
+            raise RuntimeError(f"/analyze returned {response.status_code}")
+    return summarize(latencies)
+
+CASES = {
+    'inference_single': bench_inference_single,
+    'inference_bulk': bench_inference_bulk,
+    'inference_long': bench_inference_long,
+    'csv_parse': bench_csv_parse,
+    'persistence': bench_persistence,
+    'stats': bench_stats,
+    'trends': bench_trends,
+    'video': bench_video,
+    'analyze_endpoint': bench_analyze_endpoint
+}
+
+# Baseline comparison ---------------------------------------------------------
+
+def flatten(results, prefix=''):
+    """Flatten nested case results into {'case.sub': summary} pairs."""
+    flat = {}
+    for name, value in results.items():
+        if 'p50_ms' in value:
+            flat[prefix + name] = value
+        else:
+            flat.update(flatten(value, prefix + name + '.'))
+    return flat
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline run.
+    
+    A case regresses when its p50 or p95 latency grows, or its throughput
+    drops, by more than the tolerance.
+    
+    Args:
+        results (dict): Case results of this run
+        baseline (dict): Case results of the baseline run
+        tolerance (float): Allowed relative change, e.g. 0.1 for 10%
+        
+    Returns:
+        tuple: (comparison rows, list of regressed case names)
+    """
+    rows = []
+    regressions = []
+    current, previous = flatten(results), flatten(baseline)
+    for name, summary in current.items():
+        if name not in previous:
+            continue
+        before = previous[name]
+        changes = {
+            metric: round(summary[metric] / before[metric] - 1, 3)
+            for metric in ('p50_ms', 'p95_ms', 'throughput_per_second')
+            if summary.get(metric) and before.get(metric)
+        }
+        regressed = (
+            changes.get('p50_ms', 0) > tolerance
+            or changes.get('p95_ms', 0) > tolerance
+            or changes.get('throughput_per_second', 0) < -tolerance
+        )
+        rows.append({'case': name, 'changes': changes, 'regressed': regressed})
+        if regressed:
+            regressions.append(name)
+    return rows, regressions
+
+# Runner ----------------------------------------------------------------------
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--samples', type=int, default=200, help='Operations timed by latency cases')
+    parser.add_argument('--bulk-size', type=int, default=256, help='Texts per analyze_bulk call')
+    parser.add_argument('--bulk-runs', type=int, default=20)
+    parser.add_argument('--long-size', type=int, default=32, help='Long documents per analyze_bulk call')
+    parser.add_argument('--csv-rows', type=int, default=50000)
+    parser.add_argument('--csv-runs', type=int, default=5)
+    parser.add_argument('--write-batch-size', type=int, default=1000)
+    parser.add_argument('--write-runs', type=int, default=50)
+    parser.add_argument('--stats-rows', type=int, default=1000000, help='Feedback rows seeded for the stats case')
+    parser.add_argument('--stub-model', action='store_true', help='Replace the transformer with a stub')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results saved by a previous run')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Allowed relative regression')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # Configuration is read from the environment when config.py is imported
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        os.environ['AVATAR_CACHE_FOLDER'] = os.path.join(tmp, 'avatars')
+        os.environ['VIDEO_CACHE_FOLDER'] = os.path.join(tmp, 'videos')
+        os.environ['VIDEO_IMAGE_FOLDER'] = os.path.join(tmp, 'images')
+        os.environ['SENTIMENT_CACHE_SIZE'] = '0'
+        os.environ['STATS_CACHE_TTL'] = '0'
+        os.environ['MODEL_WARMUP'] = 'false'
+        os.environ['AVATAR_BACKEND'] = 'stub'
+        
+        if args.stub_model:
+            import app.utils.sentiment_analyzer as sentiment_module
+            sentiment_module.build_pipeline = lambda *a, **k: StubPipeline()
+        
+        from app import create_app
+        from app.utils import avatar_backends
+        from app.utils import registry
+        avatar_backends.AVATAR_BACKENDS['stub'] = StubAvatarBackend
+        
+        app = create_app()
+        
+        ctx = {'app': app, 'args': args, 'tmp': tmp, 'analyzer': registry.get_sentiment_analyzer()}
+        results = {}
+        for name in args.cases:
+            print(f"Running {name}...", file=sys.stderr, flush=True)
+            results[name] = CASES[name](ctx)
+            print(json.dumps({name: results[name]}), file=sys.stderr, flush=True)
+    
+    report = {
+        'metadata': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'stub_model': args.stub_model,
+            'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline', 'cases')}
+        },
+        'results': results
+    }
+    
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows, regressions = compare(results, json.load(f)['results'], args.tolerance)
+        report['comparison'] = {'baseline': args.baseline, 'tolerance': args.tolerance, 'cases': rows, 'regressions': regressions}
+        exit_code = 1 if regressions else 0
+    
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(exit_code)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Offline generator of synthetic employee feedback for benchmarks.
+
+Sentences are assembled from templates so that the data covers the whole
+sentiment range and a realistic spread of lengths, including exact
+duplicates and the short boilerplate answers seen in real surveys.
+"""
+import csv
+import json
+import random
+
+DEPARTMENTS = ['HR', 'IT', 'Engineering', 'Sales', 'Marketing', 'Operations', 'Finance', 'Support']
+
+SUBJECTS = [
+    'The new project management system', 'My manager', 'The onboarding process', 'Our team',
+    'The office environment', 'The current workload', 'Communication between departments',
+    'The training program', 'The benefits package', 'The remote work policy', 'Leadership',
+    'The quarterly review process'
+]
+
+OPINIONS = [
+    'is absolutely fantastic and makes me love coming to work',
+    'has made our work much more efficient',
+    'is great and really supportive',
+    'is okay, but could use some improvements',
+    'is fine most of the time',
+    'is confusing and slows everyone down',
+    'is frustrating and makes deadlines hard to meet',
+    'is terrible and I am thinking about leaving',
+    'has not changed much since last year',
+    'feels disorganized and stressful'
+]
+
+DETAILS = [
+    'I appreciate the flexibility we have been given.',
+    'Meetings often run over and nobody takes notes.',
+    'The tools we use crash several times a day.',
+    'Everyone is friendly and willing to help.',
+    'There is no clear direction from management.',
+    'We finally have the resources we need.',
+    'Deadlines keep moving without explanation.',
+    'I have learned a lot in the past few months.'
+]
+
+BOILERPLATE = ['Good', 'N/A', 'No comment', 'Fine', 'Nothing to add', 'Great']
+
+def generate_feedback(count, seed=42, long_fraction=0.05, duplicate_fraction=0.1, long_sentences=(20, 60)):
+    """
+    Generate synthetic feedback rows.
+    
+    Args:
+        count (int): Number of rows
+        seed (int): Random seed, so runs are reproducible
+        long_fraction (float): Share of rows that are long multi-paragraph answers
+        duplicate_fraction (float): Share of rows that are short boilerplate answers
+        long_sentences (tuple): Range of extra sentences in a long answer
+        
+    Returns:
+        list: List of {'feedback': str, 'department': str} dictionaries
+    """
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < duplicate_fraction:
+            text = rng.choice(BOILERPLATE)
+        else:
+            sentences = [f"{rng.choice(SUBJECTS)} {rng.choice(OPINIONS)}."]
+            extra = rng.randint(*long_sentences) if roll > 1 - long_fraction else rng.randint(0, 3)
+            sentences.extend(rng.choice(DETAILS) for _ in range(extra))
+            text = ' '.join(sentences)
+        rows.append({'feedback': text, 'department': rng.choice(DEPARTMENTS)})
+    return rows
+
+def write_feedback_csv(path, count, seed=42, **kwargs):
+    """
+    Write synthetic feedback to a CSV file in the /upload format.
+    
+    Args:
+        path (str): Destination file
+        count (int): Number of rows
+        seed (int): Random seed
+        **kwargs: Passed to generate_feedback
+        
+    Returns:
+        str: The path that was written
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['feedback', 'department'])
+        writer.writeheader()
+        # Generate in slices so very large files don't need all rows in memory
+        for offset in range(0, count, 10000):
+            writer.writerows(generate_feedback(min(10000, count - offset), seed=seed + offset, **kwargs))
+    return path
+
+def write_feedback_file(path, count, file_format, seed=42, **kwargs):
+    """
+    Write synthetic feedback in one of the upload formats.
+    
+    Rows also carry an 'id' and a 'submitted_at' column, which the upload
+    readers are expected to skip.
+    
+    Args:
+        path (str): Destination file
+        count (int): Number of rows
+        file_format (str): 'csv', 'xlsx', 'jsonl' or 'parquet'
+        seed (int): Random seed
+        **kwargs: Passed to generate_feedback
+        
+    Returns:
+        str: The path that was written
+    """
+    columns = ['id', 'feedback', 'department', 'submitted_at']
+    
+    def slices():
+        # Generate in slices so very large files don't need all rows in memory
+        for offset in range(0, count, 10000):
+            rows = generate_feedback(min(10000, count - offset), seed=seed + offset, **kwargs)
+            yield [
+                {'id': offset + index + 1, 'submitted_at': '2024-01-01T09:00:00', **row}
+                for index, row in enumerate(rows)
+            ]
+    
+    if file_format == 'csv':
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for rows in slices():
+                writer.writerows(rows)
+    elif file_format == 'xlsx':
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(columns)
+        for rows in slices():
+            for row in rows:
+                sheet.append([row[column] for column in columns])
+        workbook.save(path)
+    elif file_format == 'jsonl':
+        with open(path, 'w', encoding='utf-8') as f:
+            for rows in slices():
+                f.writelines(json.dumps(row) + '\n' for row in rows)
+    elif file_format == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for rows in slices():
+                table = pa.Table.from_pylist(rows)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"Unknown format: {file_format}")
+    return path
\ No newline at end of file
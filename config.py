@@ -12,9 +12,106 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'instance', 'sentiment.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool; pre-ping replaces connections the server has closed
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    }
+    # In-memory SQLite shares one connection (StaticPool), which takes no sizing options
+    if not (SQLALCHEMY_DATABASE_URI in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in SQLALCHEMY_DATABASE_URI):
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30))
+        })
+    
+    # Apply pending schema migrations at startup (otherwise run `flask db upgrade`)
+    DB_MIGRATE_ON_STARTUP = os.getenv('DB_MIGRATE_ON_STARTUP', 'true').lower() == 'true'
+    
+    # Applied to every new SQLite connection; WAL lets readers run during bulk writes
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))  # Milliseconds a writer waits for a lock
+    }
+    DB_WRITE_BATCH_SIZE = int(os.getenv('DB_WRITE_BATCH_SIZE', 1000))  # Rows per bulk insert transaction
+    
     # Security configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     
     # Upload configuration
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    UPLOAD_FOLDER = 'uploads' 
\ No newline at end of file
+    # Uploads are streamed in chunks, so the size limit can be lifted with MAX_CONTENT_LENGTH=0
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024)) or None  # 16MB max file size
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 1000))  # Rows analyzed and committed at a time
+    UPLOAD_DEDUPE = os.getenv('UPLOAD_DEDUPE', 'false').lower() == 'true'  # Skip rows already stored, unless ?dedupe= says otherwise
+    
+    # Background upload jobs
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    JOB_MAX_ERRORS = int(os.getenv('JOB_MAX_ERRORS', 1000))  # Row errors stored per job
+    JOB_HEARTBEAT_TIMEOUT = int(os.getenv('JOB_HEARTBEAT_TIMEOUT', 600))  # Seconds without progress before a running job counts as dead
+    UPLOAD_FOLDER = 'uploads'
+    
+    # Avatars are generated once per category and served from the cache folder
+    AVATAR_BACKEND = os.getenv('AVATAR_BACKEND')  # 'openai' or 'local'; unset picks openai when OPENAI_API_KEY is set
+    AVATAR_SIZE = os.getenv('AVATAR_SIZE', '1024x1024')
+    AVATAR_CACHE_FOLDER = os.getenv('AVATAR_CACHE_FOLDER', os.path.join(basedir, 'instance', 'media', 'avatars'))
+    
+    # Sentiment videos are rendered once per category and served from the cache folder
+    VIDEO_IMAGE_FOLDER = os.getenv('VIDEO_IMAGE_FOLDER', 'static/images')
+    VIDEO_CACHE_FOLDER = os.getenv('VIDEO_CACHE_FOLDER', os.path.join(basedir, 'instance', 'media', 'videos'))
+    VIDEO_DURATION = int(os.getenv('VIDEO_DURATION', 4))  # Seconds
+    VIDEO_PREBUILD = os.getenv('VIDEO_PREBUILD', 'false').lower() == 'true'  # Render all videos at startup
+    
+    # Avatar and video generation run concurrently on a bounded pool
+    MEDIA_WORKERS = int(os.getenv('MEDIA_WORKERS', 4))
+    AVATAR_TIMEOUT = float(os.getenv('AVATAR_TIMEOUT', 30))  # Seconds /analyze waits for the avatar
+    VIDEO_TIMEOUT = float(os.getenv('VIDEO_TIMEOUT', 30))  # Seconds /analyze waits for the video
+    
+    # Sentiment analysis configuration
+    MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'false').lower() == 'true'  # Load the model in the background at startup
+    MODEL_WARMUP_ATTEMPTS = int(os.getenv('MODEL_WARMUP_ATTEMPTS', 3))  # Tries per warm-up before waiting for the next /ready
+    MODEL_WARMUP_RETRY_DELAY = float(os.getenv('MODEL_WARMUP_RETRY_DELAY', 5))  # Seconds before the first retry, doubled after each
+    SENTIMENT_BATCH_SIZE = int(os.getenv('SENTIMENT_BATCH_SIZE', 32))
+    SENTIMENT_MAX_LENGTH = int(os.getenv('SENTIMENT_MAX_LENGTH', 0)) or None  # None uses the model's limit
+    SENTIMENT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'pytorch')  # 'pytorch', 'quantized' (int8) or 'onnx'
+    SENTIMENT_NUM_THREADS = int(os.getenv('SENTIMENT_NUM_THREADS', 0)) or None  # Intra-op threads, None keeps the default
+    SENTIMENT_LONG_TEXT = os.getenv('SENTIMENT_LONG_TEXT', 'chunk')  # 'chunk' (overlapping windows) or 'truncate'
+    SENTIMENT_CHUNK_OVERLAP = int(os.getenv('SENTIMENT_CHUNK_OVERLAP', 64))  # Tokens shared by neighbouring windows
+    SENTIMENT_MAX_DOCUMENT_TOKENS = int(os.getenv('SENTIMENT_MAX_DOCUMENT_TOKENS', 4096))  # Tokens analyzed per text
+    SENTIMENT_ONNX_DIR = os.getenv('SENTIMENT_ONNX_DIR', os.path.join(basedir, 'instance', 'models', 'onnx'))
+    
+    # Bulk analysis across worker processes (0 or 1 runs in the web process)
+    BULK_WORKERS = int(os.getenv('BULK_WORKERS', 0))
+    BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 256))  # Texts sent to a worker at a time
+    BULK_THREADS_PER_WORKER = int(os.getenv('BULK_THREADS_PER_WORKER', 0)) or None  # None splits the cores evenly
+    
+    # Concurrent /analyze requests are coalesced into batches of up to this size
+    MICRO_BATCH_ENABLED = os.getenv('MICRO_BATCH_ENABLED', 'true').lower() == 'true'
+    MICRO_BATCH_MAX_SIZE = int(os.getenv('MICRO_BATCH_MAX_SIZE', 16))
+    MICRO_BATCH_MAX_WAIT_MS = float(os.getenv('MICRO_BATCH_MAX_WAIT_MS', 5))
+    
+    # In-process metrics served at /metrics; disabling removes the instrumentation entirely
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Rollup buckets: minute and hour buckets are pruned after these periods (0 keeps them forever)
+    ROLLUP_MINUTE_RETENTION_HOURS = float(os.getenv('ROLLUP_MINUTE_RETENTION_HOURS', 48))
+    ROLLUP_HOUR_RETENTION_DAYS = float(os.getenv('ROLLUP_HOUR_RETENTION_DAYS', 90))
+    ROLLUP_PRUNE_INTERVAL = float(os.getenv('ROLLUP_PRUNE_INTERVAL', 600))  # Seconds between pruning passes
+    
+    # Cached /stats responses, dropped when feedback is stored in this process or after the TTL
+    STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL', 30))  # Seconds; 0 disables the cache
+    STATS_CACHE_SIZE = int(os.getenv('STATS_CACHE_SIZE', 256))
+    
+    # gzip/brotli response compression (brotli needs the optional brotli package)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # Bytes; smaller bodies are sent as they are
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))  # gzip level, 1-9
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))  # brotli quality, 0-11
+    
+    # GET /feedback page size
+    FEEDBACK_PAGE_SIZE = int(os.getenv('FEEDBACK_PAGE_SIZE', 100))
+    FEEDBACK_MAX_PAGE_SIZE = int(os.getenv('FEEDBACK_MAX_PAGE_SIZE', 1000))
+    
+    # Sentiment result cache (size 0 disables it, path enables the SQLite tier)
+    SENTIMENT_CACHE_SIZE = int(os.getenv('SENTIMENT_CACHE_SIZE', 10000))
+    SENTIMENT_CACHE_PATH = os.getenv('SENTIMENT_CACHE_PATH') 
\ No newline at end of file
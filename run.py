@@ -1,6 +1,8 @@
 from app import create_app
 
-app = create_app()
+# Bulk analysis worker processes re-import this module as __mp_main__ and don't need an app
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,174 @@
+"""
+Score feedback archives offline, without the web server.
+
+Reads CSV, XLSX, JSON Lines and Parquet files (or directories of them),
+analyzes them in batches, optionally across several worker processes,
+and stores the results in the feedback table or writes them to a CSV
+file or a Parquet dataset directory. Progress is checkpointed, so an
+interrupted run continues where it stopped, and files already scored
+are skipped on the next run, which makes the command safe to run from
+cron over a directory that keeps receiving files.
+
+Usage:
+    python score.py archive/2023 archive/2024.parquet
+    python score.py exports/ --output scores.parquet --workers 4
+    python score.py big.csv --output scores.csv --checkpoint big.checkpoint.json --restart
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+from config import Config
+
+class Progress:
+    def __init__(self, total, stream=sys.stderr, interval=1.0):
+        """
+        Report rows/sec and ETA while a run is going.
+        
+        On a terminal the line is redrawn in place; otherwise (cron, logs)
+        a line is printed at most every ten intervals.
+        
+        Args:
+            total (int): Rows expected, None if unknown
+            stream: Where progress is written
+            interval (float): Seconds between terminal updates
+        """
+        self.total = total
+        self.stream = stream
+        self.interactive = stream.isatty()
+        self.interval = interval if self.interactive else interval * 10
+        self.start_time = time.perf_counter()
+        self.last_report = 0.0
+
+    def __call__(self, rows, skipped, failed, final=False):
+        now = time.perf_counter()
+        if not final and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        
+        elapsed = now - self.start_time
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        line = f"{rows:,} rows"
+        if self.total:
+            line = f"{rows:,}/{self.total:,} rows ({rows / self.total:.1%})"
+        line += f"  {rate:,.1f} rows/s  {skipped:,} skipped  {failed:,} failed"
+        if self.total and rate > 0 and not final:
+            line += f"  ETA {timedelta(seconds=round(max(self.total - rows, 0) / rate))}"
+        
+        if self.interactive:
+            self.stream.write('\r' + line.ljust(100) + ('\n' if final else ''))
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='Feedback files or directories')
+    parser.add_argument('--output', help='CSV file or Parquet directory (.csv or .parquet); defaults to the feedback table')
+    parser.add_argument('--checkpoint', help='Progress file (defaults to the output path plus .checkpoint.json), '
+                                             'or name of the progress kept in the database (defaults to score)')
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start over')
+    parser.add_argument('--workers', type=int, default=Config.BULK_WORKERS, help='Worker processes (0/1 scores in this process)')
+    parser.add_argument('--batch-size', type=int, default=Config.SENTIMENT_BATCH_SIZE, help='Texts per forward pass')
+    parser.add_argument('--chunk-size', type=int, default=Config.UPLOAD_CHUNK_SIZE, help='Rows read and analyzed at a time')
+    parser.add_argument('--checkpoint-rows', type=int, default=10000, help='Rows between checkpoints')
+    parser.add_argument('--dedupe', action=argparse.BooleanOptionalAction, default=Config.UPLOAD_DEDUPE,
+                        help='Skip rows whose text and department are already stored')
+    parser.add_argument('--no-count', action='store_true', help="Don't count rows up front (no ETA)")
+    args = parser.parse_args()
+    
+    from app.utils import registry
+    from app.utils.batch_scoring import (
+        Checkpoint, CsvSink, DatabaseCheckpoint, DatabaseSink, ParquetSink, count_pending_rows, find_input_files,
+        score_files
+    )
+    
+    if args.output is None:
+        target = 'database'
+        checkpoint_path = args.checkpoint or 'score'
+    else:
+        target = os.path.abspath(args.output)
+        checkpoint_path = args.checkpoint or target.rstrip(os.sep) + '.checkpoint.json'
+        if os.path.splitext(target)[1].lower() not in ('.csv', '.parquet'):
+            parser.error('--output must end with .csv or .parquet')
+    
+    context = None
+    if target == 'database':
+        # The app is only needed for the database; no job queue or warm-up threads are started
+        from app import create_app
+        app = create_app(background_workers=False)
+        context = app.app_context()
+        context.push()
+    
+    try:
+        files = find_input_files(args.paths)
+        if target == 'database':
+            # Progress is committed with the rows it covers; earlier versions kept it in a JSON file
+            legacy_path = os.path.join(app.instance_path, 'score.checkpoint.json') if args.checkpoint is None else None
+            if args.restart and legacy_path is not None and os.path.exists(legacy_path):
+                os.remove(legacy_path)
+            checkpoint = DatabaseCheckpoint(checkpoint_path, legacy_path)
+            if args.restart:
+                checkpoint.clear()
+        else:
+            if args.restart and os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+            os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+            if os.path.exists(target) and not os.path.exists(checkpoint_path) and not args.restart:
+                raise ValueError(f"{args.output} exists but {checkpoint_path} does not; pass --restart to overwrite it")
+            checkpoint = Checkpoint(checkpoint_path, target)
+        total = None if args.no_count else count_pending_rows(files, checkpoint)
+    except (ValueError, OSError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        if context is not None:
+            context.pop()
+        return 1
+    
+    if target == 'database':
+        # Each flush holds fewer than checkpoint_rows + chunk_size rows; writing it in one
+        # transaction with the checkpoint keeps an interrupted run from storing rows twice
+        sink = DatabaseSink(
+            write_batch_size=max(app.config['DB_WRITE_BATCH_SIZE'], args.checkpoint_rows + args.chunk_size),
+            dedupe=args.dedupe
+        )
+    elif target.lower().endswith('.csv'):
+        sink = CsvSink(target)
+    else:
+        sink = ParquetSink(target)
+    
+    registry.configure({'BULK_WORKERS': args.workers, 'SENTIMENT_BATCH_SIZE': args.batch_size})
+    analyzer = registry.get_bulk_analyzer()
+    progress = Progress(total)
+    try:
+        summary = score_files(
+            files,
+            analyzer,
+            sink,
+            checkpoint,
+            chunk_size=args.chunk_size,
+            checkpoint_rows=args.checkpoint_rows,
+            progress_callback=progress
+        )
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun the same command to resume from checkpoint {checkpoint_path}", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"\nError: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        if hasattr(analyzer, 'close'):
+            analyzer.close()
+        if context is not None:
+            context.pop()
+    
+    progress(summary['rows'], summary['skipped'], summary['failed'], final=True)
+    summary.update({'target': target, 'checkpoint': checkpoint_path, 'input_files': len(files)})
+    if target == 'database':
+        summary['saved'] = sink.writer.rows_written
+    print(json.dumps(summary))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
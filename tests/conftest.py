@@ -0,0 +1,64 @@
+import os
+import re
+import pytest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+
+from config import Config
+from app import create_app, db
+from app.utils import registry
+import app.utils.sentiment_analyzer as sentiment_analyzer_module
+
+class FakeTokenizer:
+    """Whitespace tokenizer with the parts of the transformers API the analyzer uses."""
+    model_max_length = 512
+    is_fast = True
+    
+    def num_special_tokens_to_add(self):
+        return 2
+    
+    def __call__(self, text, return_offsets_mapping=False, **kwargs):
+        spans = [(match.start(), match.end()) for match in re.finditer(r'\S+', text)]
+        encoding = {'input_ids': list(range(len(spans)))}
+        if return_offsets_mapping:
+            encoding['offset_mapping'] = spans
+        return encoding
+
+class FakePipeline:
+    """Sentiment pipeline that labels texts mentioning 'bad' as negative."""
+    tokenizer = FakeTokenizer()
+    
+    def __init__(self):
+        self.inputs = []
+    
+    def __call__(self, inputs, **kwargs):
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        self.inputs.extend(texts)
+        return [
+            {'label': 'NEGATIVE' if 'bad' in text.lower() else 'POSITIVE', 'score': 0.9}
+            for text in texts
+        ]
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(sentiment_analyzer_module, 'build_pipeline', lambda *args, **kwargs: pipeline)
+    return pipeline
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, fake_pipeline):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(Config, 'STATS_CACHE_TTL', 0)
+    monkeypatch.setattr(Config, 'SENTIMENT_CACHE_SIZE', 0)
+    monkeypatch.setattr(Config, 'BULK_WORKERS', 0)
+    registry._instances.clear()
+    app = create_app(background_workers=False)
+    app.config['TESTING'] = True
+    yield app
+    registry._instances.clear()
+    with app.app_context():
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
\ No newline at end of file
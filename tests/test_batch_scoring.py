@@ -0,0 +1,44 @@
+import pytest
+from app import db
+from app.models.feedback import Feedback
+from app.utils import registry
+from app.utils.batch_scoring import DatabaseCheckpoint, DatabaseSink, score_files
+
+def test_interrupted_database_run_resumes_without_storing_rows_twice(app, tmp_path, monkeypatch):
+    path = tmp_path / 'archive.csv'
+    path.write_text('feedback,department\n' + ''.join(f"Answer {i},Support\n" for i in range(10)))
+    
+    # Fail while saving the second checkpoint, after its rows were inserted
+    saves = []
+    save = DatabaseCheckpoint._save
+    def failing_save(self):
+        saves.append(self.data)
+        if len(saves) == 2:
+            raise RuntimeError('interrupted')
+        save(self)
+    
+    with app.app_context():
+        analyzer = registry.get_sentiment_analyzer()
+        monkeypatch.setattr(DatabaseCheckpoint, '_save', failing_save)
+        with pytest.raises(RuntimeError):
+            score_files([str(path)], analyzer, DatabaseSink(write_batch_size=100), DatabaseCheckpoint('test'), chunk_size=2, checkpoint_rows=4)
+        assert db.session.query(Feedback).count() == 4
+        
+        monkeypatch.setattr(DatabaseCheckpoint, '_save', save)
+        summary = score_files([str(path)], analyzer, DatabaseSink(write_batch_size=100), DatabaseCheckpoint('test'), chunk_size=2, checkpoint_rows=4)
+        
+        assert summary['rows'] == 6
+        assert db.session.query(Feedback).count() == 10
+def test_database_run_without_dedupe_stores_hashes_for_later_dedupe(app, tmp_path):
+    path = tmp_path / 'archive.csv'
+    path.write_text('feedback,department\nGreat support,Support\nGreat support,Support\nBad delivery,Logistics\n')
+    
+    with app.app_context():
+        analyzer = registry.get_sentiment_analyzer()
+        plain = DatabaseSink()
+        score_files([str(path)], analyzer, plain, DatabaseCheckpoint('plain'))
+        deduplicated = DatabaseSink(dedupe=True)
+        summary = score_files([str(path)], analyzer, deduplicated, DatabaseCheckpoint('dedupe'))
+        
+        assert plain.writer.rows_written == 3
+        assert (summary['skipped'], deduplicated.writer.rows_written) == (3, 0)
\ No newline at end of file
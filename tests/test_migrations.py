@@ -0,0 +1,29 @@
+import threading
+from config import Config
+from app import create_app
+from app.migrations import MIGRATIONS, current_version, upgrade
+
+def test_concurrent_upgrades_apply_each_migration_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'fresh.db'}")
+    monkeypatch.setattr(Config, 'DB_MIGRATE_ON_STARTUP', False)
+    app = create_app(background_workers=False)
+    applied = []
+    errors = []
+    
+    def run():
+        with app.app_context():
+            try:
+                applied.extend(upgrade())
+            except Exception as e:
+                errors.append(e)
+    
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert sorted(applied) == [number for number, _, _ in MIGRATIONS]
+    with app.app_context():
+        assert current_version() == MIGRATIONS[-1][0]
\ No newline at end of file
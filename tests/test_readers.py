@@ -0,0 +1,21 @@
+import io
+from app.utils.readers import iter_feedback_batches
+
+class ReadOnlyStream:
+    """Binary stream with read() but no readable(), like SpooledTemporaryFile before Python 3.11."""
+    
+    def __init__(self, data):
+        self._buffer = io.BytesIO(data)
+    
+    def read(self, size=-1):
+        return self._buffer.read(size)
+
+def test_jsonl_reads_streams_without_the_io_interface():
+    body = '{"feedback": "Great support", "department": "Support"}\n\n{"feedback": "Bad café"}\n'
+    
+    batches = list(iter_feedback_batches(ReadOnlyStream(body.encode('utf-8')), 'jsonl', batch_size=1))
+    
+    assert batches == [
+        [{'feedback': 'Great support', 'department': 'Support'}],
+        [{'feedback': 'Bad café', 'department': ''}]
+    ]
\ No newline at end of file
@@ -0,0 +1,26 @@
+import io
+import pytest
+from app.utils import registry
+from app.utils.sentiment_analyzer import SentimentAnalyzer
+
+def test_micro_batches_do_not_replace_the_last_bulk_stats(app, client):
+    body = b'feedback\nGreat support\nBad delivery\nGreat food\n'
+    client.post('/upload', data={'file': (io.BytesIO(body), 'feedback.csv')}, content_type='multipart/form-data')
+    
+    with app.app_context():
+        registry.get_micro_batcher().analyze_sentiment('Great support')
+    
+    assert client.get('/stats/inference').get_json()['last_bulk']['texts'] == 3
+
+def test_document_budget_below_the_model_limit_caps_the_text(fake_pipeline):
+    analyzer = SentimentAnalyzer(max_document_tokens=5)
+    text = ' '.join(f"word{i}" for i in range(20))
+    
+    analyzer.analyze_sentiment(text)
+    analyzer.analyze_bulk([text + ' again'])
+    
+    assert fake_pipeline.inputs == ['word0 word1 word2 word3 word4'] * 2
+
+def test_document_budget_must_be_positive(fake_pipeline):
+    with pytest.raises(ValueError):
+        SentimentAnalyzer(max_document_tokens=0)
\ No newline at end of file
@@ -0,0 +1,33 @@
+import io
+from datetime import datetime, timedelta, timezone
+import pytest
+
+@pytest.fixture
+def stored_feedback(client):
+    body = b'feedback,department\nGreat support,Support\nBad delivery,Logistics\n'
+    response = client.post('/upload', data={'file': (io.BytesIO(body), 'feedback.csv')}, content_type='multipart/form-data')
+    assert response.status_code == 200
+
+@pytest.mark.parametrize('path, params', [
+    ('/stats', {}),
+    ('/stats/timeseries', {'interval': 'hour'}),
+    ('/stats/trends', {'interval': 'day'}),
+    ('/feedback', {})
+])
+def test_time_filters_accept_utc_offsets(client, stored_feedback, path, params):
+    # An hour ago in UTC, written in a UTC+02:00 local time
+    start = (datetime.now(timezone.utc) - timedelta(hours=1)).astimezone(timezone(timedelta(hours=2)))
+    
+    response = client.get(path, query_string={'start': start.isoformat(), **params})
+    
+    assert response.status_code == 200, response.get_json()
+    if path == '/stats':
+        assert response.get_json()['total'] == 2
+    elif path == '/feedback':
+        assert len(response.get_json()['items']) == 2
+
+@pytest.mark.parametrize('query', [{'start': 'yesterday'}, {'end': '2024-13-01T00:00:00'}, {'window': '99999999999d'}])
+def test_time_filters_reject_unparseable_values(client, query):
+    response = client.get('/stats', query_string=query)
+    
+    assert response.status_code == 400
\ No newline at end of file
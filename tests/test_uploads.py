@@ -0,0 +1,41 @@
+import io
+import json
+
+def _upload(client, filename, body, **params):
+    return client.post(
+        '/upload',
+        query_string=params,
+        data={'file': (io.BytesIO(body), filename)},
+        content_type='multipart/form-data'
+    )
+
+def test_jsonl_upload_larger_than_the_spool_threshold(client):
+    # Werkzeug spools uploads over 500KB to a SpooledTemporaryFile that rolls over to disk
+    rows = [{'feedback': f"Row {i} was {'bad' if i % 2 else 'great'} " + 'x' * 100} for i in range(6000)]
+    body = '\n'.join(json.dumps(row) for row in rows).encode('utf-8')
+    assert len(body) > 500 * 1024
+    
+    response = _upload(client, 'feedback.jsonl', body)
+    
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['analyzed'] == 6000
+    assert response.get_json()['saved'] == 6000
+
+def test_dedupe_upload_skips_rows_of_an_earlier_plain_upload(client):
+    body = b'feedback,department\nGreat support,Support\nBad delivery,Logistics\nGreat support,Support\n'
+    
+    plain = _upload(client, 'feedback.csv', body).get_json()
+    plain_again = _upload(client, 'feedback.csv', body).get_json()
+    deduplicated = _upload(client, 'feedback.csv', body, dedupe='true').get_json()
+    
+    assert (plain['saved'], plain['skipped']) == (3, 0)
+    assert (plain_again['saved'], plain_again['skipped']) == (3, 0)
+    assert (deduplicated['analyzed'], deduplicated['saved'], deduplicated['skipped']) == (0, 0, 3)
+
+def test_failed_rows_are_not_counted_as_analyzed(client):
+    body = b'feedback,department\nGreat support,Support\n,Logistics\nBad delivery,Logistics\n'
+    
+    response = _upload(client, 'feedback.csv', body, results='page').get_json()
+    
+    assert (response['analyzed'], response['failed'], response['saved']) == (2, 1, 2)
+    assert response['page']['total'] == 3
\ No newline at end of file